@@ -7,16 +7,24 @@ useful design patterns such as singleton and cached_class, and many more.
 
 from __future__ import annotations
 
-from importlib.metadata import PackageNotFoundError, version
-
 __author__ = "Shyue Ping Ong"
 __copyright__ = "Copyright 2014, The Materials Virtual Lab"
 __maintainer__ = "Shyue Ping Ong"
 __email__ = "ongsp@ucsd.edu"
 __date__ = "Oct 12 2020"
 
-try:
-    __version__ = version("monty")
-except PackageNotFoundError:  # pragma: no cover
-    # package is not installed
-    pass
+
+def __getattr__(name: str) -> str:
+    # __version__ is looked up on first access, as importlib.metadata is
+    # slow to import and every monty submodule imports this package
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            globals()["__version__"] = version("monty")
+        except PackageNotFoundError:  # pragma: no cover
+            # package is not installed
+            pass
+        else:
+            return globals()["__version__"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,11 +7,13 @@ from __future__ import annotations
 
 import bz2
 import errno
+import functools
 import gzip
 import io
 import lzma
 import mmap
 import os
+import re
 import subprocess
 import time
 import warnings
@@ -22,6 +24,42 @@ if TYPE_CHECKING:
     from typing import IO, Any, Iterator, Union
 
 
+@functools.lru_cache(maxsize=None)
+def _import_zstandard():
+    """Import zstandard on first use, as it is slow to import.
+
+    Returns:
+        The zstandard module, or None if it is not installed.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _zstd_open(filename: Union[str, Path], mode: str, **kwargs: Any) -> IO:
+    zstandard = _import_zstandard()
+    if zstandard is None:
+        raise RuntimeError("zstandard must be installed to open .zst files.")
+    return zstandard.open(filename, mode, **kwargs)
+
+
+# Leading bytes of the compression formats supported by zopen, with the
+# functions opening them.
+# The bz2 header includes the block size and the magic number of the first
+# block (or of the end of an empty stream), as "BZh" alone is a plausible
+# start of a text file.
+_MAGIC_NUMBERS = (
+    (re.compile(rb"\x1f\x8b"), gzip.open),
+    (re.compile(rb"BZh[1-9](?:1AY&SY|\x17rE8P\x90)"), bz2.open),
+    (re.compile(rb"\xfd7zXZ\x00"), lzma.open),
+    (re.compile(rb"\x28\xb5\x2f\xfd"), _zstd_open),
+)
+# Number of bytes needed to match all of _MAGIC_NUMBERS
+_MAGIC_SIZE = 10
+
+
 class EncodingWarning(Warning): ...  # Added in Python 3.10
 
 
@@ -29,14 +67,23 @@ def zopen(
     filename: Union[str, Path],
     /,
     mode: str | None = None,
+    *,
+    sniff: bool | None = None,
     **kwargs: Any,
 ) -> IO | bz2.BZ2File | gzip.GzipFile | lzma.LZMAFile:
     """
-    This function wraps around `[bz2/gzip/lzma].open` and `open`
+    This function wraps around `[bz2/gzip/lzma/zstandard].open` and `open`
     to deal intelligently with compressed or uncompressed files.
     Supports context manager:
         `with zopen(filename, mode="rt", ...)`
 
+    The compression is selected by the file extension (".bz2", ".gz", ".xz",
+    ".lzma" and ".zst", the latter requiring zstandard). When reading a file
+    with another extension in text mode, its first bytes are checked for the
+    gzip, bz2, xz and zstd magic numbers, so that misnamed or extension-less
+    compressed files are decompressed as well. Binary mode only does so with
+    sniff=True, so that e.g. ".tgz" archives are read as they are.
+
     Important Notes:
         - Default `mode` should not be used, and would not be allow
             in future versions.
@@ -50,6 +97,9 @@ def zopen(
         filename (str | Path): The file to open.
         mode (str): The mode in which the file is opened, you should
             explicitly specify "b" for binary or "t" for text.
+        sniff (bool): Whether to detect the compression of files read with
+            an unknown extension from their magic number. Defaults to True
+            in text mode and False in binary mode.
         **kwargs: Additional keyword arguments to pass to `open`.
 
     Returns:
@@ -112,10 +162,59 @@ def zopen(
         return gzip.open(filename, mode, **kwargs)
     if ext in {".xz", ".lzma"}:
         return lzma.open(filename, mode, **kwargs)
+    if ext == ".zst":
+        return _zstd_open(filename, mode, **kwargs)
+
+    if sniff is None:
+        sniff = "b" not in mode
+    if (
+        sniff
+        and mode.startswith("r")
+        and "+" not in mode
+        and kwargs.keys() <= _TEXT_KWARGS
+    ):
+        return _sniff_open(filename, mode, **kwargs)
 
     return open(filename, mode, **kwargs)
 
 
+# Keyword arguments of open that _sniff_open supports
+_TEXT_KWARGS = frozenset({"encoding", "errors", "newline"})
+
+
+def _sniff_open(
+    filename: Union[str, Path], mode: str, **kwargs: Any
+) -> IO | bz2.BZ2File | gzip.GzipFile | lzma.LZMAFile:
+    """Open a file for reading, decompressing it if its first bytes are the
+    magic number of a supported compression format.
+
+    Uncompressed files, by far the most common case, are read through the
+    handle used to peek at the first bytes.
+    """
+    raw = open(filename, "rb")
+    try:
+        head = raw.peek(_MAGIC_SIZE)[:_MAGIC_SIZE]
+    except BaseException:
+        raw.close()
+        raise
+
+    for magic, opener in _MAGIC_NUMBERS:
+        if magic.match(head):
+            if opener is _zstd_open and _import_zstandard() is None:
+                # Read as is if zstandard is not installed
+                break
+            # gzip/bz2/lzma do not close file objects passed to them, so
+            # let them open the file themselves
+            raw.close()
+            return opener(filename, mode, **kwargs)
+
+    if "b" in mode:
+        return raw
+    wrapper = io.TextIOWrapper(raw, **kwargs)
+    wrapper.mode = mode  # type: ignore[misc]
+    return wrapper
+
+
 def _get_line_ending(
     file: str
     | Path
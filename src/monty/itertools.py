@@ -7,8 +7,6 @@ from __future__ import annotations
 import itertools
 from typing import TYPE_CHECKING
 
-import numpy as np
-
 if TYPE_CHECKING:
     from typing import Iterable
 
@@ -45,6 +43,8 @@ def iterator_from_slice(s) -> Iterable:
         return itertools.count(start=start, step=step)
 
     # xrange-like iterator that supports float.
+    import numpy as np
+
     return iter(np.arange(start, s.stop, step))
 
 
@@ -4,35 +4,49 @@ JSON serialization and deserialization utilities.
 
 from __future__ import annotations
 
+import base64
 import dataclasses
 import datetime
+import functools
+import hashlib
 import json
+import math
 import os
 import pathlib
 import pickle
+import re
+import struct
+import threading
+import time
 import traceback
 import types
+import weakref
 from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import Enum
 from hashlib import sha1
 from importlib import import_module
 from inspect import getfullargspec, isclass
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Generic,
+    Literal,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 from uuid import UUID, uuid4
 
-import numpy as np
-from ruamel.yaml import YAML
-
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Callable, Iterable, Iterator
 
-try:
-    import bson
-    from bson import json_util
-except ImportError:
-    bson = None
-    json_util = None
+    import numpy as np
+    from pydantic import TypeAdapter
 
 try:
     import orjson
@@ -42,10 +56,30 @@ except ImportError:
 
 __version__ = "3.0.0"
 
+_T = TypeVar("_T")
+
+
+@functools.lru_cache(maxsize=None)
+def _import_bson():
+    """Import bson (part of pymongo) on first use, as it is slow to import.
+
+    Returns:
+        The bson module, or None if it is not installed.
+    """
+    try:
+        import bson
+        import bson.json_util
+        import bson.objectid
+    except ImportError:
+        return None
+    return bson
+
 
 def _load_redirect(redirect_file) -> dict:
     try:
         with open(redirect_file, encoding="utf-8") as f:
+            from ruamel.yaml import YAML
+
             yaml = YAML()
             d = yaml.load(f)
     except OSError:
@@ -70,6 +104,310 @@ def _load_redirect(redirect_file) -> dict:
     return dict(redirect_dict)
 
 
+def _split_class_path(path: str) -> tuple[str, str]:
+    """Split a fully qualified class path into its module and class names."""
+    module, _, classname = path.rpartition(".")
+    return module, classname
+
+
+class RedirectRegistry:
+    """Redirects of moved classes, applied by MontyDecoder before importing
+    the class of a serialized dict.
+
+    Redirects are read from any number of YAML files, each mapping old fully
+    qualified class paths to new ones (see MSONable), and can be added or
+    removed at runtime with register and unregister. Programmatic changes take
+    precedence over the files, and later files over earlier ones. The files
+    are re-read when their modification time changes, at most every
+    reload_interval seconds when a new top-level decode starts. All sources
+    are merged into a flat (module, class) -> (module, class) map, and the
+    classes resolved by MontyDecoder are invalidated whenever it changes.
+
+    The default registry is REDIRECTS, which reads ~/.monty.yaml and is also
+    exposed in the legacy nested format as MSONable.REDIRECT.
+    """
+
+    def __init__(
+        self, files: Iterable[str | Path] = (), reload_interval: float | None = 1.0
+    ) -> None:
+        """
+        Args:
+            files: Redirect files, in increasing order of precedence. Files
+                that do not exist are ignored until they are created.
+            reload_interval (float): Minimum number of seconds between two
+                checks of the modification times of the files. None disables
+                automatic reloading, call reload to pick up changes.
+        """
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        # path -> (stat signature, flat redirects)
+        self._files: dict[str, tuple[tuple[int, int] | None, dict]] = {
+            os.fspath(f): (None, {}) for f in files
+        }
+        self._file_map: dict[tuple[str, str], tuple[str, str]] = {}
+        # Programmatic changes, None marks an unregistered redirect
+        self._overrides: dict[tuple[str, str], tuple[str, str] | None] = {}
+        self._flat: dict[tuple[str, str], tuple[str, str]] = {}
+        self._view = _RedirectDict(self)
+        self._loaded = False
+        self._next_check = 0.0
+
+    @property
+    def files(self) -> list[str]:
+        """The redirect files, in increasing order of precedence."""
+        return list(self._files)
+
+    @property
+    def flat(self) -> dict[tuple[str, str], tuple[str, str]]:
+        """The merged (module, class) -> (module, class) redirects. Do not
+        modify it, use register and unregister instead."""
+        self._ensure_loaded()
+        return self._flat
+
+    @property
+    def view(self) -> dict:
+        """The redirects in the nested {old_module: {old_class: {"@module":
+        new_module, "@class": new_class}}} format of MSONable.REDIRECT.
+        Modifying it registers or unregisters redirects."""
+        self._ensure_loaded()
+        return self._view
+
+    def get(self, modname: str, classname: str) -> tuple[str, str] | None:
+        """The (module, class) target of a redirected class, or None."""
+        self._ensure_loaded()
+        return self._flat.get((modname, classname))
+
+    def register(self, old: str, new: str) -> None:
+        """Redirect the fully qualified class path old to new."""
+        self._apply({_split_class_path(old): _split_class_path(new)})
+
+    def unregister(self, old: str) -> None:
+        """Remove the redirect of the fully qualified class path old, including
+        one read from a redirect file."""
+        self._apply({_split_class_path(old): None})
+
+    def replace(self, redirects: dict) -> None:
+        """Replace all redirects, including those read from the files, by
+        redirects in the nested format of MSONable.REDIRECT. The files are
+        still watched and entries added to them later take effect."""
+        with self._lock:
+            self._ensure_loaded()
+            changes: dict[tuple[str, str], tuple[str, str] | None] = dict.fromkeys(
+                self._flat
+            )
+            for old_module, classes in redirects.items():
+                for old_class, new in classes.items():
+                    changes[old_module, old_class] = (new["@module"], new["@class"])
+            self._apply(changes)
+
+    def add_file(self, path: str | Path) -> None:
+        """Add a redirect file, taking precedence over the existing ones."""
+        with self._lock:
+            self._files[os.fspath(path)] = (None, {})
+            if self._loaded:
+                self.reload()
+
+    def remove_file(self, path: str | Path) -> None:
+        """Remove a redirect file and the redirects read from it."""
+        with self._lock:
+            del self._files[os.fspath(path)]
+            if self._loaded:
+                self._rebuild()
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the redirect files that were modified since they were last
+        read.
+
+        Args:
+            force (bool): Re-read all files regardless of their modification
+                times.
+
+        Returns:
+            bool: Whether any file was re-read.
+        """
+        with self._lock:
+            changed = False
+            for path, (signature, redirects) in self._files.items():
+                try:
+                    stat = os.stat(path)
+                    new_signature: tuple[int, int] | None = (
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                    )
+                except OSError:
+                    new_signature = None
+                if force or new_signature != signature:
+                    redirects = {
+                        (old_module, old_class): (new["@module"], new["@class"])
+                        for old_module, classes in _load_redirect(path).items()
+                        for old_class, new in classes.items()
+                    }
+                    self._files[path] = (new_signature, redirects)
+                    changed = True
+            if changed or not self._loaded:
+                self._loaded = True
+                self._rebuild()
+            if self.reload_interval is not None:
+                self._next_check = time.monotonic() + self.reload_interval
+            return changed
+
+    def check(self) -> None:
+        """Reload the modified redirect files if reload_interval has elapsed
+        since the last check."""
+        if not self._loaded:
+            self._ensure_loaded()
+        elif self.reload_interval is not None and time.monotonic() >= self._next_check:
+            self.reload()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.reload(force=True)
+
+    def _rebuild(self) -> None:
+        """Merge the files and the programmatic changes into the flat map."""
+        file_map: dict[tuple[str, str], tuple[str, str]] = {}
+        for _, redirects in self._files.values():
+            file_map.update(redirects)
+        self._file_map = file_map
+        flat = dict(file_map)
+        for key, target in self._overrides.items():
+            if target is None:
+                flat.pop(key, None)
+            else:
+                flat[key] = target
+        self._flat = flat
+        self._view._reset(flat)
+        _resolve_class.cache_clear()
+
+    def _apply(self, changes: dict[tuple[str, str], tuple[str, str] | None]) -> None:
+        """Record programmatic changes and update the merged redirects."""
+        with self._lock:
+            self._ensure_loaded()
+            for key, target in changes.items():
+                self._overrides[key] = target
+                if target is None:
+                    self._flat.pop(key, None)
+                else:
+                    self._flat[key] = target
+                self._view._set(key, target)
+            _resolve_class.cache_clear()
+
+
+class _RedirectDict(dict):
+    """Nested view of a RedirectRegistry, used for MSONable.REDIRECT. Setting
+    or deleting entries, on the top level or on the per-module dicts,
+    registers or unregisters the corresponding redirects."""
+
+    def __init__(self, registry: RedirectRegistry, module: str | None = None) -> None:
+        super().__init__()
+        self._registry = registry
+        self._module = module
+
+    def _reset(self, flat: dict[tuple[str, str], tuple[str, str]]) -> None:
+        dict.clear(self)
+        for key, target in flat.items():
+            self._set(key, target)
+
+    def _set(self, key: tuple[str, str], target: tuple[str, str] | None) -> None:
+        """Update the view without notifying the registry."""
+        module, classname = key
+        classes = dict.get(self, module)
+        if target is None:
+            if classes is not None:
+                dict.pop(classes, classname, None)
+                if not classes:
+                    dict.__delitem__(self, module)
+            return
+        if classes is None:
+            classes = _RedirectDict(self._registry, module)
+            dict.__setitem__(self, module, classes)
+        dict.__setitem__(
+            classes, classname, {"@module": target[0], "@class": target[1]}
+        )
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        if self._module is not None:
+            self._registry._apply(
+                {(self._module, key): (value["@module"], value["@class"])}
+            )
+            return
+        changes: dict[tuple[str, str], tuple[str, str] | None] = {
+            (key, classname): None for classname in self.get(key, ())
+        }
+        for classname, new in value.items():
+            changes[key, classname] = (new["@module"], new["@class"])
+        self._registry._apply(changes)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if self._module is not None:
+            self._registry._apply({(self._module, key): None})
+        else:
+            self._registry._apply({(key, classname): None for classname in self[key]})
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    # Ignored like in the typeshed stub of dict.__ior__, which mypy also
+    # reports as incompatible with dict.__or__
+    def __ior__(self, other: Any, /) -> _RedirectDict:  # type: ignore[misc]
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        value = dict(value) if isinstance(value, _RedirectDict) else value
+        del self[key]
+        return value
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def clear(self) -> None:
+        for key in list(self):
+            del self[key]
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _RedirectDescriptor:
+    """Descriptor for MSONable.REDIRECT, which returns the nested view of
+    REDIRECTS. ~/.monty.yaml is only read on first access."""
+
+    def __get__(self, obj: object, objtype: type | None = None) -> dict:
+        return REDIRECTS.view
+
+
+# The redirects applied by MontyDecoder
+REDIRECTS = RedirectRegistry([os.path.join(os.path.expanduser("~"), ".monty.yaml")])
+
+
+def _check_redirects() -> None:
+    """Called when a top-level decode starts. A dict assigned to
+    MSONable.REDIRECT, which replaces the descriptor, becomes the redirect
+    table of REDIRECTS, after which MSONable.REDIRECT is its view again."""
+    redirect = MSONable.__dict__["REDIRECT"]
+    if type(redirect) is not _RedirectDescriptor:
+        REDIRECTS.replace(redirect)
+        MSONable.REDIRECT = _RedirectDescriptor()  # type: ignore[assignment]
+    REDIRECTS.check()
+
+
 def _check_type(obj: object, type_str: tuple[str, ...] | str) -> bool:
     """Alternative to isinstance that avoids imports.
 
@@ -101,11 +439,240 @@ def _check_type(obj: object, type_str: tuple[str, ...] | str) -> bool:
     if isclass(obj):
         return False
 
-    type_str = type_str if isinstance(type_str, tuple) else (type_str,)
+    names = _mro_names(type(obj))
+    if isinstance(type_str, str):
+        return type_str in names
+    return not names.isdisjoint(type_str)
 
-    mro = type(obj).mro()
 
-    return any(f"{o.__module__}.{o.__qualname__}" == ts for o in mro for ts in type_str)
+class _TypeCache(Generic[_T]):
+    """Decorator caching the result of a function of a class.
+
+    Unlike functools.lru_cache, classes are held by weak references, so
+    classes created at runtime (e.g. by type() in a loop) can still be
+    garbage collected, which also drops their cache entries.
+    """
+
+    def __init__(self, func: Callable[[type], _T]) -> None:
+        self._func = func
+        self._cache: weakref.WeakKeyDictionary[type, _T] = weakref.WeakKeyDictionary()
+        functools.update_wrapper(self, func)
+
+    def __call__(self, cls: type) -> _T:
+        try:
+            return self._cache[cls]
+        except KeyError:
+            pass
+        value = self._func(cls)
+        self._cache[cls] = value
+        return value
+
+    def cache_clear(self) -> None:
+        self._cache.clear()
+
+
+@_TypeCache
+def _mro_names(cls: type) -> frozenset[str]:
+    """Fully qualified names of all the classes in the MRO of cls."""
+    return frozenset(f"{c.__module__}.{c.__qualname__}" for c in cls.__mro__)
+
+
+# Optional third-party types that need special handling in MontyEncoder and
+# jsanitize besides their codecs, checked by name so that the libraries are
+# never imported just to test for them.
+_TYPE_KINDS = (
+    ("pandas.core.base.PandasObject", "pandas"),
+    ("pydantic.main.BaseModel", "pydantic"),
+)
+
+
+@_TypeCache
+def _type_kind(cls: type) -> str | None:
+    """Classify instances of cls against _TYPE_KINDS.
+
+    The result is cached per type, so objects of the same class only pay
+    for the MRO scan once.
+
+    Returns:
+        str: "pandas", "pydantic" or None if cls is neither.
+    """
+    names = _mro_names(cls)
+    for type_str, kind in _TYPE_KINDS:
+        if type_str in names:
+            return kind
+    return None
+
+
+_MISSING = object()
+
+
+class _AsDictPlan:
+    """Per-class information used by the default MSONable.as_dict.
+
+    Everything that only depends on the class (the constructor signature,
+    the attribute names to look up and the module version) is computed once
+    and cached on the class by _get_as_dict_plan.
+    """
+
+    __slots__ = ("args", "is_enum", "module", "name", "varargs", "version")
+
+    def __init__(self, cls: type) -> None:
+        self.module = cls.__module__
+        self.name = cls.__name__
+
+        try:
+            parent_module = self.module.split(".", maxsplit=1)[0]
+            module_version = import_module(parent_module).__version__
+            self.version: str | None = str(module_version)
+        except (AttributeError, ImportError):
+            self.version = None
+
+        spec = getfullargspec(cls.__init__)  # type: ignore[misc]
+        self.args = tuple(
+            (c, f"_{c}") for c in spec.args + spec.kwonlyargs if c != "self"
+        )
+        self.varargs = spec.varargs
+        self.is_enum = issubclass(cls, Enum)
+
+
+def _get_as_dict_plan(cls: type) -> _AsDictPlan:
+    """Get the as_dict plan of a class, building it on first use.
+
+    The plan is stored in the class __dict__ so that subclasses never
+    reuse the plan of their parent.
+    """
+    plan = cls.__dict__.get("_as_dict_plan")
+    if plan is None:
+        plan = _AsDictPlan(cls)
+        # type.__setattr__ bypasses metaclasses that restrict attribute
+        # assignment (e.g. Enum)
+        type.__setattr__(cls, "_as_dict_plan", plan)
+    return plan
+
+
+def _recursive_as_dict(obj):
+    if isinstance(obj, (list, tuple)):
+        return [_recursive_as_dict(it) for it in obj]
+    if isinstance(obj, dict):
+        return {kk: _recursive_as_dict(vv) for kk, vv in obj.items()}
+    if hasattr(obj, "as_dict"):
+        refs = _ENCODE_REFS.get()
+        return obj.as_dict() if refs is None else _tracked_as_dict(obj, refs)
+    if dataclasses.is_dataclass(obj):
+        d = dataclasses.asdict(obj)  # type: ignore[arg-type]
+        d.update(
+            {
+                "@module": obj.__class__.__module__,
+                "@class": obj.__class__.__name__,
+            }
+        )
+        return d
+    return obj
+
+
+# Objects already serialized by the active MontyEncoder(track_refs=True),
+# keyed on their id: (ref id, object). The objects are kept alive so that
+# their ids are not reused while encoding.
+_ENCODE_REFS: ContextVar[dict[int, tuple[int, Any]] | None] = ContextVar(
+    "_ENCODE_REFS", default=None
+)
+
+
+def _tracked_as_dict(obj, refs: dict[int, tuple[int, Any]]) -> dict:
+    """as_dict of obj for MontyEncoder(track_refs=True).
+
+    The first occurrence of an object is serialized with an "@ref_id" entry,
+    later ones (including cyclic ones) are replaced by {"@ref": ref_id}.
+    """
+    entry = refs.get(id(obj))
+    if entry is not None:
+        return {"@ref": entry[0]}
+    ref_id = len(refs)
+    refs[id(obj)] = (ref_id, obj)
+    token = _ENCODE_REFS.set(refs)
+    try:
+        d = obj.as_dict()
+    finally:
+        _ENCODE_REFS.reset(token)
+    return {**d, "@ref_id": ref_id}
+
+
+def _json_key(key: Any) -> str:
+    """The string a dict key is converted to by json.dumps."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        if key != key:
+            return "NaN"
+        if key in {math.inf, -math.inf}:
+            return "Infinity" if key > 0 else "-Infinity"
+        return float.__repr__(key)
+    return str(key)
+
+
+def _update_content_hash(hasher, obj, encoder: MontyEncoder) -> None:
+    """Feed obj to hasher in the canonical form used by content_hash.
+
+    Every value starts with a one byte type tag and variable length values
+    are length-prefixed, so that different structures never produce the same
+    byte stream. Tuples are hashed like lists, as they are after a JSON round
+    trip, and dict keys are converted to strings like json does for the
+    same reason.
+    """
+    if obj is None:
+        hasher.update(b"N")
+    elif obj is True:
+        hasher.update(b"T")
+    elif obj is False:
+        hasher.update(b"F")
+    elif isinstance(obj, int):
+        hasher.update(b"i%d;" % obj)
+    elif isinstance(obj, float):
+        hasher.update(b"f" + struct.pack("<d", obj))
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        hasher.update(b"s%d:" % len(data))
+        hasher.update(data)
+    elif isinstance(obj, bytes):
+        hasher.update(b"b%d:" % len(obj))
+        hasher.update(obj)
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(b"[")
+        for item in obj:
+            _update_content_hash(hasher, item, encoder)
+        hasher.update(b"]")
+    elif isinstance(obj, dict):
+        hasher.update(b"{")
+        items = sorted(
+            ((_json_key(k), v) for k, v in obj.items()), key=lambda kv: kv[0]
+        )
+        for key, value in items:
+            if key == "@version":
+                continue
+            _update_content_hash(hasher, key, encoder)
+            _update_content_hash(hasher, value, encoder)
+        hasher.update(b"}")
+    elif _check_type(obj, "numpy.ndarray") and obj.dtype.kind not in "OV":
+        import numpy as np
+
+        header = f"{obj.dtype.str}{obj.shape}".encode("ascii")
+        hasher.update(b"a%d:" % len(header))
+        hasher.update(header)
+        hasher.update(np.ascontiguousarray(obj).reshape(-1).view(np.uint8))
+    elif _check_type(obj, "numpy.ndarray"):
+        _update_content_hash(hasher, obj.tolist(), encoder)
+    elif _check_type(obj, "numpy.generic"):
+        _update_content_hash(hasher, obj.item(), encoder)
+    else:
+        _update_content_hash(hasher, encoder.default(obj), encoder)
 
 
 class MSONable:
@@ -147,72 +714,50 @@ class MSONable:
 
     Example:
     old_module.old_class: new_module.new_class
+
+    Redirects can also be changed at runtime, see RedirectRegistry.
+    MSONable.REDIRECT is a view of REDIRECTS in the nested format
+    {old_module: {old_class: {"@module": new_module, "@class": new_class}}}.
+    Assigning a dict to it replaces all redirects when the next decode
+    starts, after which MSONable.REDIRECT is the view again.
     """
 
-    REDIRECT = _load_redirect(os.path.join(os.path.expanduser("~"), ".monty.yaml"))
+    REDIRECT: dict = _RedirectDescriptor()  # type: ignore[assignment]
 
     def as_dict(self) -> dict:
         """
         A JSON serializable dict representation of an object.
         """
+        plan = _get_as_dict_plan(self.__class__)
         d: dict[str, Any] = {
-            "@module": self.__class__.__module__,
-            "@class": self.__class__.__name__,
+            "@module": plan.module,
+            "@class": plan.name,
+            "@version": plan.version,
         }
 
-        try:
-            parent_module = self.__class__.__module__.split(".", maxsplit=1)[0]
-            module_version = import_module(parent_module).__version__
-            d["@version"] = str(module_version)
-        except (AttributeError, ImportError):
-            d["@version"] = None
-
-        spec = getfullargspec(self.__class__.__init__)
-
-        def recursive_as_dict(obj):
-            if isinstance(obj, (list, tuple)):
-                return [recursive_as_dict(it) for it in obj]
-            if isinstance(obj, dict):
-                return {kk: recursive_as_dict(vv) for kk, vv in obj.items()}
-            if hasattr(obj, "as_dict"):
-                return obj.as_dict()
-            if dataclasses is not None and dataclasses.is_dataclass(obj):
-                d = dataclasses.asdict(obj)
-                d.update(
-                    {
-                        "@module": obj.__class__.__module__,
-                        "@class": obj.__class__.__name__,
-                    }
-                )
-                return d
-            return obj
-
-        for c in spec.args + spec.kwonlyargs:
-            if c != "self":
-                try:
-                    a = getattr(self, c)
-                except AttributeError:
-                    try:
-                        a = getattr(self, "_" + c)
-                    except AttributeError:
-                        raise NotImplementedError(
-                            "Unable to automatically determine as_dict "
-                            "format from class. MSONAble requires all "
-                            "args to be present as either self.argname or "
-                            "self._argname, and kwargs to be present under "
-                            "a self.kwargs variable to automatically "
-                            "determine the dict format. Alternatively, "
-                            "you can implement both as_dict and from_dict."
-                        )
-                d[c] = recursive_as_dict(a)
+        for name, private_name in plan.args:
+            a = getattr(self, name, _MISSING)
+            if a is _MISSING:
+                a = getattr(self, private_name, _MISSING)
+                if a is _MISSING:
+                    raise NotImplementedError(
+                        "Unable to automatically determine as_dict "
+                        "format from class. MSONAble requires all "
+                        "args to be present as either self.argname or "
+                        "self._argname, and kwargs to be present under "
+                        "a self.kwargs variable to automatically "
+                        "determine the dict format. Alternatively, "
+                        "you can implement both as_dict and from_dict."
+                    )
+            d[name] = _recursive_as_dict(a)
         if hasattr(self, "kwargs"):
             d.update(**self.kwargs)
-        if spec.varargs is not None and getattr(self, spec.varargs, None) is not None:
-            d.update({spec.varargs: getattr(self, spec.varargs)})
+        if plan.varargs is not None and getattr(self, plan.varargs, None) is not None:
+            d.update({plan.varargs: getattr(self, plan.varargs)})
         if hasattr(self, "_kwargs"):
             d.update(**self._kwargs)
-        if isinstance(self, Enum):
-            d.update({"value": self.value})
+        if plan.is_enum:
+            d.update({"value": self.value})  # type: ignore[attr-defined]
         return d
 
     @classmethod
@@ -225,18 +770,21 @@ class MSONable:
         Returns:
             MSONable class.
         """
-        decoded = {
-            k: MontyDecoder().process_decoded(v)
-            for k, v in d.items()
-            if not k.startswith("@")
-        }
+        # Decoded here even without an active context, as calling from_dict
+        # again would run the overrides of subclasses twice
+        ctx = _DECODE_CONTEXT.get()
+        with _decode_context(MontyDecoder() if ctx is None else ctx.decoder) as ctx:
+            process_decoded = ctx.decoder.process_decoded
+            decoded = {
+                k: process_decoded(v) for k, v in d.items() if not k.startswith("@")
+            }
         return cls(**decoded)
 
     def to_json(self) -> str:
         """
         Returns a json string representation of the MSONable object.
         """
-        return json.dumps(self, cls=MontyEncoder)
+        return dumps(self)
 
     def unsafe_hash(self):
         """
@@ -273,6 +821,54 @@ class MSONable:
         ordered_keys = [item for item in ordered_keys if "@" not in item[0]]
         return sha1(json.dumps(OrderedDict(ordered_keys)).encode("utf-8"))
 
+    def content_hash(self, algorithm: str = "blake2b", memoize: bool = False) -> str:
+        """
+        Returns a hex digest of the content of the object, e.g. for use as a
+        cache or deduplication key. The as_dict representation is walked
+        once and fed to the hash in a canonical, type-tagged form: dict keys
+        are sorted, "@version" entries are ignored and numpy arrays are
+        hashed from their raw buffer. The digest does not depend on the
+        process or on dict ordering, so it is stable across runs.
+
+        Args:
+            algorithm (str): Any algorithm supported by hashlib.new, or one
+                of the xxhash algorithms ("xxh64", "xxh3_64", "xxh3_128"...)
+                if xxhash is installed.
+            memoize (bool): If True, the digest is stored on the object and
+                returned by subsequent calls with the same algorithm. Only
+                use it for objects that are not modified afterwards.
+
+        Returns:
+            str: The hex digest.
+        """
+        if memoize:
+            cached = self.__dict__.get("_content_hashes", {}).get(algorithm)
+            if cached is not None:
+                return cached
+
+        if algorithm.startswith("xxh"):
+            try:
+                import xxhash
+            except ImportError as exc:
+                raise ImportError(
+                    f"xxhash must be installed to use {algorithm=}"
+                ) from exc
+            hasher = getattr(xxhash, algorithm)()
+        else:
+            hasher = hashlib.new(algorithm)
+        _update_content_hash(hasher, self.as_dict(), MontyEncoder())
+        digest = hasher.hexdigest()
+
+        if memoize:
+            try:
+                hashes = self.__dict__.setdefault("_content_hashes", {})
+            except AttributeError:
+                # No instance __dict__ to store it (e.g. __slots__ classes)
+                pass
+            else:
+                hashes[algorithm] = digest
+        return digest
+
     @classmethod
     def _validate_monty(cls, __input_value):
         """
@@ -355,7 +951,7 @@ class MSONable:
         custom_schema = cls._generic_json_schema()
         field_schema.update(custom_schema)
 
-    def _get_partial_json(self, json_kwargs, pickle_kwargs):
+    def _get_partial_json(self, json_kwargs, pickle_kwargs, array_threshold=None):
         """Used with the save method. Gets the json representation of a class
         with the unserializable components sustituted for hash references."""
 
@@ -363,7 +959,7 @@ class MSONable:
             pickle_kwargs = {}
         if json_kwargs is None:
             json_kwargs = {}
-        encoder = MontyEncoder(allow_unserializable_objects=True, **json_kwargs)
+        encoder = _get_save_encoder(json_kwargs, array_threshold)
         encoded = encoder.encode(self)
         return encoder, encoded, json_kwargs, pickle_kwargs
 
@@ -398,6 +994,7 @@ class MSONable:
         json_kwargs=None,
         pickle_kwargs=None,
         strict=True,
+        array_threshold=None,
     ):
         """Utility that uses the standard tools of MSONable to convert the
         class to json format, but also save it to disk. In addition, this
@@ -412,6 +1009,21 @@ class MSONable:
         {save_dir}. This includes a pickled object for each attribute that
         e serialized.
 
+        If array_threshold is set, numpy arrays of at least that many bytes
+        are saved as {save_dir}/{stem}.{name}.npy files instead of being inlined
+        in the json file, which allows load to memory-map them.
+
+        The json file is encoded incrementally instead of being built as a
+        string first, and is compressed if its name ends with a compression
+        extension supported by monty.io.zopen (e.g. "class.json.gz"). All
+        files are written to temporary files that are fsynced and then
+        renamed into place, the json file last, so that a crash never leaves
+        a partially written file behind. The references to pickled objects
+        and arrays have unique names, so that the json file left by an
+        interrupted save never refers to the files of another save; load
+        rejects a pickle file that does not belong to the json file. The
+        .npy files of the replaced json file are removed once it is replaced.
+
         Parameters
         ----------
         file_path : os.PathLike
@@ -427,44 +1039,94 @@ class MSONable:
             Keyword arguments to pass to pickle.dump.
         strict : bool
             If True, will not allow you to overwrite existing files.
+        array_threshold : int
+            Size in bytes from which numpy arrays are saved to .npy files.
+            If None (default), all arrays are saved in the json file.
         """
+        from monty.io import zopen
 
         json_path = Path(json_path)
         save_dir = json_path.parent
-
-        encoded, name_object_map, json_kwargs, pickle_kwargs = self.get_partial_json(
-            json_kwargs, pickle_kwargs
-        )
+        pickle_path = save_dir / f"{json_path.stem}.pkl"
 
         if mkdir:
             save_dir.mkdir(exist_ok=True, parents=True)
 
-        # Define the pickle path
-        pickle_path = save_dir / f"{json_path.stem}.pkl"
-
         # Check if the files exist and the strict parameter is True
         if strict and json_path.exists():
             raise FileExistsError(f"strict is true and file {json_path} exists")
         if strict and pickle_path.exists():
             raise FileExistsError(f"strict is true and file {pickle_path} exists")
 
-        # Save the json file
-        with open(json_path, "w", encoding="utf-8") as outfile:
-            outfile.write(encoded)
-
-        # Save the pickle file if we have anything to save from the name_object_map
-        if name_object_map is not None:
-            with open(pickle_path, "wb") as f:
-                pickle.dump(name_object_map, f, **pickle_kwargs)
+        encoder = _get_save_encoder(json_kwargs or {}, array_threshold)
+        tmp_json_path = _temporary_path(json_path)
+        renames: list[tuple[Path, Path]] = []
+        try:
+            # The unserializable objects and large arrays are collected while
+            # the json file is encoded
+            with zopen(tmp_json_path, "wt", encoding="utf-8") as outfile:
+                for chunk in encoder.iterencode(self):
+                    outfile.write(chunk)
+
+            array_paths = {
+                save_dir / f"{json_path.stem}.{name}.npy": arr
+                for name, arr in encoder._array_map.items()
+            }
+            if array_paths:
+                import numpy as np
+
+                for array_path, arr in array_paths.items():
+                    renames.append((_temporary_path(array_path), array_path))
+                    np.save(renames[-1][0], arr, allow_pickle=False)
+
+            # Save the pickle file if we have anything to save from the
+            # name_object_map
+            if encoder._name_object_map:
+                renames.append((_temporary_path(pickle_path), pickle_path))
+                with open(renames[-1][0], "wb") as f:
+                    pickle.dump(encoder._name_object_map, f, **(pickle_kwargs or {}))
+
+            # The json file is renamed last, so that it is only replaced once
+            # all the files it refers to are in place
+            renames.append((tmp_json_path, json_path))
+            for tmp_path, _ in renames:
+                with open(tmp_path, "r+b") as f:
+                    os.fsync(f.fileno())
+            for tmp_path, path in renames:
+                os.replace(tmp_path, path)
+        finally:
+            # Only left over if saving failed
+            tmp_json_path.unlink(missing_ok=True)
+            for tmp_path, _ in renames:
+                tmp_path.unlink(missing_ok=True)
+
+        # Arrays of previous saves, which no json file refers to anymore
+        array_name = re.compile(rf"{re.escape(json_path.stem)}\.{_ARRAY_NAME}\.npy")
+        for path in save_dir.iterdir():
+            if array_name.fullmatch(path.name) and path not in array_paths:
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    # e.g. memory-mapped on Windows
+                    pass
+        _fsync_dir(save_dir)
 
     @classmethod
-    def load(cls, file_path):
+    def load(cls, file_path, mmap_mode="r", lazy=False):
         """Loads a class from a provided json file.
 
         Parameters
         ----------
         file_path : os.PathLike
             The json file to load from.
+        mmap_mode : str
+            Passed to numpy.load for the arrays saved to .npy files, see
+            MSONable.save. The default "r" memory-maps them read-only so
+            their data is only read when accessed. None reads them into
+            memory.
+        lazy : bool
+            If True, nested MSONable objects are only built when they are
+            accessed, see MontyDecoder.
 
         Returns
         -------
@@ -472,42 +1134,95 @@ class MSONable:
             An instance of the class being reloaded.
         """
 
-        d = _d_from_path(file_path)
-        return cls.from_dict(d)
+        d = _d_from_path(file_path, mmap_mode=mmap_mode)
+        with _decode_context(MontyDecoder(lazy=lazy)):
+            return cls.from_dict(d)
 
 
-def load(path):
+def load(path, mmap_mode="r", lazy=False):
     """Loads a json file that was saved using MSONable.save.
 
     Parameters
     ----------
     path : os.PathLike
         Path to the json file to load.
+    mmap_mode : str
+        Passed to numpy.load for the arrays saved to .npy files, see
+        MSONable.load.
+    lazy : bool
+        If True, nested MSONable objects are only built when they are
+        accessed, see MontyDecoder.
 
     Returns
     -------
     MSONable
     """
 
-    d = _d_from_path(path)
+    d = _d_from_path(path, mmap_mode=mmap_mode)
     module = d["@module"]
     klass = d["@class"]
     module = import_module(module)
     klass = getattr(module, klass)
-    return klass.from_dict(d)
+    with _decode_context(MontyDecoder(lazy=lazy)):
+        return klass.from_dict(d)
+
+
+# Names of the arrays saved to .npy files by MSONable.save
+_ARRAY_NAME = r"\d{6}-[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
+
+def _get_save_encoder(json_kwargs: dict, array_threshold: int | None) -> MontyEncoder:
+    return MontyEncoder(
+        allow_unserializable_objects=True,
+        array_threshold=array_threshold,
+        **json_kwargs,
+    )
 
 
-def _d_from_path(file_path):
+def _temporary_path(path: Path) -> Path:
+    """A unique hidden path in the directory of path, with the same name
+    suffix so that zopen and numpy.save handle it like path."""
+    return path.with_name(f".{uuid4().hex}.{path.name}")
+
+
+def _fsync_dir(path: Path) -> None:
+    """Make the renames in a directory durable. Not supported on Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _d_from_path(file_path, mmap_mode="r"):
+    from monty.io import zopen
+
     json_path = Path(file_path)
     save_dir = json_path.parent
     pickle_path = save_dir / f"{json_path.stem}.pkl"
 
-    with open(json_path, "r", encoding="utf-8") as infile:
-        d = json.loads(infile.read())
-
-    if pickle_path.exists():
-        name_object_map = pickle.load(open(pickle_path, "rb"))
-        d = _recursive_name_object_map_replacement(d, name_object_map)
+    with zopen(json_path, "rt", encoding="utf-8") as infile:
+        s = infile.read()
+    d = json.loads(s)
+    if '"@object_reference"' in s:
+        if not pickle_path.exists():
+            raise MSONError(f"{json_path} is incomplete, {pickle_path} is missing")
+        with open(pickle_path, "rb") as f:
+            name_object_map = pickle.load(f)
+        try:
+            d = _recursive_name_object_map_replacement(d, name_object_map)
+        except KeyError:
+            raise MSONError(
+                f"{pickle_path} does not belong to {json_path}, which was not "
+                "completely saved"
+            ) from None
+    if '"@array_reference"' in s:
+        d = _recursive_array_reference_replacement(d, json_path, mmap_mode)
     return d
 
 
@@ -525,6 +1240,28 @@ def _recursive_name_object_map_replacement(d, name_object_map):
     return d
 
 
+def _recursive_array_reference_replacement(d, json_path, mmap_mode):
+    if isinstance(d, dict):
+        if "@array_reference" in d:
+            import numpy as np
+
+            array_path = (
+                json_path.parent / f"{json_path.stem}.{d['@array_reference']}.npy"
+            )
+            if not array_path.exists():
+                raise MSONError(f"{json_path} is incomplete, {array_path} is missing")
+            return np.load(array_path, mmap_mode=mmap_mode, allow_pickle=False)
+        return {
+            k: _recursive_array_reference_replacement(v, json_path, mmap_mode)
+            for k, v in d.items()
+        }
+    elif isinstance(d, list):
+        return [
+            _recursive_array_reference_replacement(x, json_path, mmap_mode) for x in d
+        ]
+    return d
+
+
 class MontyEncoder(json.JSONEncoder):
     """
     A Json Encoder which supports the MSONable API, plus adds support for
@@ -532,22 +1269,84 @@ class MontyEncoder(json.JSONEncoder):
     Usage::
         # Add it as a *cls* keyword when using json.dump
         json.dumps(object, cls=MontyEncoder)
+
+        # Store numpy arrays as base64-encoded buffers instead of lists
+        json.dumps(object, cls=MontyEncoder, array_encoding="base64")
+
+        # Serialize objects referenced several times only once
+        json.dumps(object, cls=MontyEncoder, track_refs=True)
     """
 
     def __init__(
-        self, *args, allow_unserializable_objects: bool = False, **kwargs
+        self,
+        *args,
+        allow_unserializable_objects: bool = False,
+        array_encoding: Literal["list", "base64", "bytes"] = "list",
+        array_threshold: int | None = None,
+        track_refs: bool = False,
+        **kwargs,
     ) -> None:
+        """
+        Args:
+            *args: Positional arguments passed to json.JSONEncoder.
+            allow_unserializable_objects (bool): If True, objects that cannot
+                be serialized are replaced by "@object_reference" entries.
+            array_encoding ("list" | "base64" | "bytes"): How numpy arrays are
+                stored. "list" (default) uses nested lists. "base64" stores
+                the raw array buffer as a base64 string together with the
+                dtype, shape and byte order, which is much faster and more
+                compact for large arrays. "bytes" stores the raw buffer as
+                bytes and is only meaningful for binary formats such as
+                msgpack. Object arrays always use "list".
+            array_threshold (int): If not None, numpy arrays of at least this
+                many bytes are replaced by "@array_reference" entries and
+                kept in the encoder, see MSONable.save. Object arrays are
+                always encoded.
+            track_refs (bool): If True, objects serialized with as_dict that
+                are referenced several times (by the encoded objects or by
+                the values returned by MSONable.as_dict) are serialized once
+                with an "@ref_id" entry and replaced by {"@ref": ref_id}
+                afterwards. MontyDecoder restores the shared objects. This
+                also stops the recursion of cyclic references, which however
+                cannot be decoded. Not compatible with sort_keys, as
+                references must follow the objects they refer to.
+            **kwargs: Keyword arguments passed to json.JSONEncoder.
+        """
         super().__init__(*args, **kwargs)
+        if array_encoding not in {"list", "base64", "bytes"}:
+            raise ValueError(f"Unknown array_encoding {array_encoding!r}")
+        if track_refs and self.sort_keys:
+            raise ValueError("track_refs cannot be used with sort_keys")
         self._allow_unserializable_objects = allow_unserializable_objects
+        self._array_encoding = array_encoding
+        self._array_threshold = array_threshold
         self._name_object_map: dict[str, Any] = {}
+        self._array_map: dict[str, np.ndarray] = {}
+        self._refs: dict[int, tuple[int, Any]] | None = {} if track_refs else None
         self._index: int = 0
 
+    def iterencode(self, o, _one_shot=False):
+        """Encode o, yielding the JSON string in chunks. Also used by encode.
+
+        With track_refs, references never point to objects serialized by
+        previous calls, so that every document can be decoded on its own.
+        """
+        if self._refs is not None:
+            self._refs = {}
+        return super().iterencode(o, _one_shot)
+
     def _update_name_object_map(self, o):
         name = f"{self._index:012}-{str(uuid4())}"
         self._index += 1
         self._name_object_map[name] = o
         return {"@object_reference": name}
 
+    def _update_array_map(self, arr: np.ndarray) -> dict:
+        # Unique, see MSONable.save
+        name = f"{len(self._array_map):06}-{uuid4()}"
+        self._array_map[name] = arr
+        return {"@array_reference": name}
+
     def default(self, o) -> dict:
         """
         Overriding default method for JSON encoding. This method does two
@@ -562,80 +1361,13 @@ class MontyEncoder(json.JSONEncoder):
         Return:
             Python dict representation.
         """
-        if isinstance(o, datetime.datetime):
-            return {
-                "@module": "datetime",
-                "@class": "datetime",
-                "string": str(o),
-            }
-        if isinstance(o, UUID):
-            return {"@module": "uuid", "@class": "UUID", "string": str(o)}
-        if isinstance(o, Path):
-            return {"@module": "pathlib", "@class": "Path", "string": str(o)}
-
-        # Support for Pytorch Tensors
-        if _check_type(o, "torch.Tensor"):
-            d: dict[str, Any] = {
-                "@module": "torch",
-                "@class": "Tensor",
-                "dtype": o.type(),
-            }
-            if "Complex" in o.type():
-                d["data"] = [o.real.tolist(), o.imag.tolist()]
-            else:
-                d["data"] = o.numpy().tolist()
-            return d
-
-        if isinstance(o, np.ndarray):
-            if str(o.dtype).startswith("complex"):
-                return {
-                    "@module": "numpy",
-                    "@class": "array",
-                    "dtype": str(o.dtype),
-                    "data": [o.real.tolist(), o.imag.tolist()],
-                }
-            return {
-                "@module": "numpy",
-                "@class": "array",
-                "dtype": str(o.dtype),
-                "data": o.tolist(),
-            }
-
-        if isinstance(o, np.generic):
-            return o.item()
-
-        if _check_type(o, "pandas.core.frame.DataFrame"):
-            return {
-                "@module": "pandas",
-                "@class": "DataFrame",
-                "data": o.to_json(default_handler=MontyEncoder().encode),
-            }
-        if _check_type(o, "pandas.core.series.Series"):
-            return {
-                "@module": "pandas",
-                "@class": "Series",
-                "data": o.to_json(default_handler=MontyEncoder().encode),
-            }
-
-        if _check_type(o, "pint.Quantity"):
-            d = {
-                "@module": "pint",
-                "@class": "Quantity",
-                "data": str(o),
-            }
-            try:
-                module_version = import_module("pint").__version__
-                d["@version"] = str(module_version)
-            except (AttributeError, ImportError):
-                d["@version"] = None
-            return d
-
-        if bson is not None and isinstance(o, bson.objectid.ObjectId):
-            return {
-                "@module": "bson.objectid",
-                "@class": "ObjectId",
-                "oid": str(o),
-            }
+        if isclass(o):
+            kind = None
+        else:
+            encode = _find_encoder(type(o))
+            if encode is not None:
+                return encode(o, self)
+            kind = _type_kind(type(o))
 
         if callable(o) and not isinstance(o, MSONable):
             try:
@@ -647,7 +1379,7 @@ class MontyEncoder(json.JSONEncoder):
                 raise AttributeError(e)
 
         try:
-            if _check_type(o, "pydantic.main.BaseModel"):
+            if kind == "pydantic":
                 d = o.model_dump()
             elif (
                 dataclasses is not None
@@ -657,7 +1389,12 @@ class MontyEncoder(json.JSONEncoder):
                 # This handles dataclasses that are not subclasses of MSONAble.
                 d = dataclasses.asdict(o)  # type: ignore[call-overload, arg-type]
             elif hasattr(o, "as_dict"):
-                d = o.as_dict()
+                if self._refs is None:
+                    d = o.as_dict()
+                else:
+                    d = _tracked_as_dict(o, self._refs)
+                    if "@ref" in d:
+                        return d
             elif isinstance(o, Enum):
                 d = {"value": o.value}
             elif self._allow_unserializable_objects:
@@ -686,6 +1423,388 @@ class MontyEncoder(json.JSONEncoder):
             return json.JSONEncoder.default(self, o)
 
 
+# json.dumps arguments that the orjson backend of dumps can reproduce
+_ORJSON_JSON_KWARGS = frozenset({"indent", "sort_keys"})
+_JSON_KWARGS = frozenset(
+    {
+        "skipkeys",
+        "ensure_ascii",
+        "check_circular",
+        "allow_nan",
+        "indent",
+        "separators",
+        "default",
+        "sort_keys",
+    }
+)
+
+
+class _OrjsonFallback(Exception):
+    """Raised when orjson would not produce the same JSON as json.dumps."""
+
+
+def dumps(obj: Any, cls: type[MontyEncoder] | None = None, **kwargs) -> str:
+    """Serialize obj to a JSON string with MontyEncoder.
+
+    This is equivalent to json.dumps(obj, cls=MontyEncoder, **kwargs), but
+    uses orjson when it is installed. In that case MontyEncoder.default is
+    only called for the objects orjson cannot serialize natively. The
+    standard library json module is used instead whenever orjson would not
+    produce equivalent output (e.g. NaN or infinite floats, plain Enum
+    members, UUIDs, integers above 64 bits) or json.dumps arguments other
+    than indent=2 and sort_keys are given. The output may differ from
+    json.dumps in whitespace and escaping of non-ASCII characters only.
+
+    Args:
+        obj: Object to serialize.
+        cls (MontyEncoder): Encoder class, MontyEncoder by default.
+        **kwargs: Keyword arguments of json.dumps and of the encoder.
+
+    Returns:
+        str: JSON string.
+    """
+    cls = cls or MontyEncoder
+    if (
+        orjson is not None
+        and kwargs.get("indent") in {None, 2}
+        and (kwargs.keys() & _JSON_KWARGS) <= _ORJSON_JSON_KWARGS
+        and cls.encode is MontyEncoder.encode
+        and cls.iterencode is MontyEncoder.iterencode
+    ):
+        encoder = cls(**kwargs)
+
+        def default(o):
+            d = encoder.default(o)
+            _check_orjson_compatible(d)
+            return d
+
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys"):
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            _check_orjson_compatible(obj)
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except (_OrjsonFallback, orjson.JSONEncodeError):
+            # Also reached for unserializable objects, in which case
+            # json.dumps raises the usual error.
+            pass
+
+    return json.dumps(obj, cls=cls, **kwargs)
+
+
+def _check_orjson_compatible(obj: Any) -> None:
+    """Raise _OrjsonFallback if orjson would serialize obj differently from
+    json.dumps with MontyEncoder.
+
+    Only containers are traversed, other objects are handed to
+    MontyEncoder.default by orjson and checked there.
+    """
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        o_type = type(o)
+        if o_type is str or o_type is int or o_type is bool or o is None:
+            continue
+        if isinstance(o, float):
+            if not math.isfinite(o):
+                raise _OrjsonFallback
+        elif isinstance(o, dict):
+            for k in o:
+                if type(k) is not str and not (
+                    k is None
+                    or isinstance(k, (str, int))
+                    or (isinstance(k, float) and math.isfinite(k))
+                ):
+                    raise _OrjsonFallback
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+        elif isinstance(o, UUID) or (
+            # json only serializes Enum members natively if they are also
+            # str or int, while orjson always uses their value.
+            isinstance(o, Enum) and not isinstance(o, (str, int))
+        ):
+            raise _OrjsonFallback
+
+
+class _DecodeContext:
+    """State shared by all nested decoding steps of one top-level decode.
+
+    A context is opened by the outermost MontyDecoder.process_decoded or
+    MSONable.from_dict call, so that nested from_dict calls reuse the same
+    decoder instead of creating a new one for every field.
+    """
+
+    __slots__ = ("decoder", "refs")
+
+    def __init__(self, decoder: MontyDecoder) -> None:
+        self.decoder = decoder
+        # Objects decoded from dicts with an "@ref_id", see MontyEncoder
+        self.refs: dict[int, Any] = {}
+
+
+_DECODE_CONTEXT: ContextVar[_DecodeContext | None] = ContextVar(
+    "_DECODE_CONTEXT", default=None
+)
+
+
+@contextmanager
+def _decode_context(decoder: MontyDecoder) -> Iterator[_DecodeContext]:
+    """Open a decoding context bound to decoder, or reuse the active one."""
+    ctx = _DECODE_CONTEXT.get()
+    if ctx is not None:
+        yield ctx
+        return
+
+    _check_redirects()
+    ctx = _DecodeContext(decoder)
+    token = _DECODE_CONTEXT.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _DECODE_CONTEXT.reset(token)
+
+
+# Bounded, as the cached classes are kept alive
+@functools.lru_cache(maxsize=1024)
+def _resolve_class(
+    modname: str, classname: str
+) -> tuple[str, str, type | None, str | None]:
+    """Resolve the "@module"/"@class" pair of a serialized dict.
+
+    The redirects of REDIRECTS are applied first, then the target class is
+    imported and classified by how MontyDecoder should build it. The result
+    is cached until the redirects change or clear_class_cache is called.
+
+    Returns:
+        tuple: The (possibly redirected) module and class names, the class
+            (None if it is handled by a codec or does not exist) and
+            the build kind, one of "from_dict", "enum", "pydantic",
+            "dataclass" or None if the dict should be decoded as a plain dict.
+    """
+    if target := REDIRECTS.get(modname, classname):
+        modname, classname = target
+
+    if not modname or (modname, classname) in _DECODERS:
+        # Decoded by a registered codec, no need to import the class
+        return modname, classname, None, None
+
+    mod = __import__(modname, globals(), locals(), [classname], 0)
+    cls_ = getattr(mod, classname, None)
+    if cls_ is None:
+        return modname, classname, None, None
+
+    kind: str | None = None
+    if hasattr(cls_, "from_dict"):
+        kind = "from_dict"
+    elif isclass(cls_):
+        if issubclass(cls_, Enum):
+            kind = "enum"
+        elif "pydantic.main.BaseModel" in _mro_names(cls_):
+            kind = "pydantic"
+        elif not issubclass(cls_, MSONable) and dataclasses.is_dataclass(cls_):
+            kind = "dataclass"
+    return modname, classname, cls_, kind
+
+
+# Annotations of fields whose JSON values never hold serialized objects
+_PRIMITIVE_TYPES = (int, float, str, bool, type(None))
+_UNION_TYPES = (Union, getattr(types, "UnionType", Union))
+_CONTAINER_TYPES = (list, tuple, set, frozenset, dict)
+
+
+def _is_primitive_annotation(tp: Any) -> bool:
+    """Whether values of a field annotated with tp are plain JSON values,
+    e.g. int, Optional[str] or dict[str, list[float]]."""
+    if tp in _PRIMITIVE_TYPES:
+        return True
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if origin is Literal:
+        return all(isinstance(arg, _PRIMITIVE_TYPES) for arg in args)
+    if origin is Annotated:
+        return _is_primitive_annotation(args[0])
+    if origin in _UNION_TYPES or origin in _CONTAINER_TYPES:
+        # Bare containers (e.g. list) may hold anything
+        return bool(args) and all(
+            arg is Ellipsis or _is_primitive_annotation(arg) for arg in args
+        )
+    return False
+
+
+class _DecodePlan:
+    """How MontyDecoder builds a pydantic model or a dataclass.
+
+    Fields of primitive type are passed to the class as they are, all other
+    values (including those of keys that are not fields) are decoded
+    recursively first. Pydantic models without a custom __init__ are built
+    with model_validate, and lists of them in bulk with a TypeAdapter.
+    """
+
+    def __init__(self, cls: type) -> None:
+        self.cls = cls
+        self.validate = None
+        self._adapter: TypeAdapter | None = None
+        try:
+            if "pydantic.main.BaseModel" in _mro_names(cls):
+                annotations = {
+                    name: field.annotation
+                    for name, field in cls.model_fields.items()  # type: ignore[attr-defined]
+                }
+                base_model = next(
+                    c
+                    for c in cls.__mro__
+                    if f"{c.__module__}.{c.__qualname__}" == "pydantic.main.BaseModel"
+                )
+                if cls.__init__ is base_model.__init__:  # type: ignore[misc]
+                    self.validate = cls.model_validate  # type: ignore[attr-defined]
+            else:
+                hints = get_type_hints(cls, include_extras=True)
+                annotations = {f.name: hints[f.name] for f in dataclasses.fields(cls)}
+        except Exception:
+            # Unresolvable annotations, decode all values
+            annotations = {}
+        self.primitive = frozenset(
+            name for name, tp in annotations.items() if _is_primitive_annotation(tp)
+        )
+
+    def decode_fields(self, data: dict, decoder: MontyDecoder) -> dict:
+        primitive = self.primitive
+        process_decoded = decoder.process_decoded
+        return {
+            k: v if k in primitive else process_decoded(v)
+            for k, v in data.items()
+            if not k.startswith("@")
+        }
+
+    def build(self, data: dict, decoder: MontyDecoder) -> Any:
+        fields = self.decode_fields(data, decoder)
+        if self.validate is not None:
+            return self.validate(fields)
+        return self.cls(**fields)
+
+    def build_many(self, items: list, decoder: MontyDecoder) -> list:
+        """Build a list of pydantic models with a single validation call.
+        Items that are not dicts must be models that are already built."""
+        if self._adapter is None:
+            from pydantic import TypeAdapter
+
+            self._adapter = TypeAdapter(list[self.cls])  # type: ignore[name-defined]
+        return self._adapter.validate_python(
+            [
+                self.decode_fields(item, decoder) if type(item) is dict else item
+                for item in items
+            ]
+        )
+
+
+@_TypeCache
+def _get_decode_plan(cls: type) -> _DecodePlan:
+    return _DecodePlan(cls)
+
+
+def clear_class_cache() -> None:
+    """Clear the cache of classes resolved by MontyDecoder.
+
+    Needed when modules are reloaded after objects of the affected classes
+    have already been decoded. Changes to the redirects clear it
+    automatically.
+    """
+    _resolve_class.cache_clear()
+    _get_decode_plan.cache_clear()
+
+
+# Codecs registered with register_codec. Encoders are keyed on types or on
+# fully qualified type names, decoders on the ("@module", "@class") pair.
+_ENCODERS: dict[type | str, Callable[[Any, json.JSONEncoder], Any]] = {}
+_DECODERS: dict[tuple[str, str], Callable[[dict, MontyDecoder], Any]] = {}
+
+
+def register_codec(
+    type_: type | str,
+    encode: Callable[[Any, json.JSONEncoder], Any],
+    decode: Callable[[dict, MontyDecoder], Any] | None = None,
+    *,
+    module: str | None = None,
+    classname: str | None = None,
+) -> None:
+    """Register how objects of a type are encoded and decoded.
+
+    MontyEncoder.default looks up the encoder by the type of the object,
+    subclasses included, before trying the as_dict protocol. MontyDecoder
+    looks up the decoder by the "@module" and "@class" of a dict, after
+    applying MSONable.REDIRECT. Registering a type again replaces its codec.
+    E.g.:
+
+        def encode_coo(o, encoder):
+            return {
+                "@module": "scipy.sparse",
+                "@class": "coo_matrix",
+                "shape": o.shape,
+                "data": o.data,
+                "coords": [o.row, o.col],
+            }
+
+
+        def decode_coo(d, decoder):
+            from scipy.sparse import coo_matrix
+
+            data, coords = decoder.process_decoded([d["data"], d["coords"]])
+            return coo_matrix((data, coords), shape=d["shape"])
+
+
+        register_codec("scipy.sparse._coo.coo_matrix", encode_coo, decode_coo)
+
+    Args:
+        type_ (type | str): The type, or its fully qualified name as used by
+            _check_type. Names avoid importing optional libraries before they
+            are actually used.
+        encode (callable): encode(obj, encoder) returning a JSON-serializable
+            representation of obj, usually a dict with "@module" and "@class"
+            keys. Nested objects are encoded by the encoder.
+        decode (callable): decode(d, decoder) returning the object for the
+            dict d. Nested values have to be decoded with
+            decoder.process_decoded. It may return NotImplemented to decode d
+            as a plain dict instead, e.g. when an optional library is missing.
+        module (str): "@module" handled by decode. Defaults to the module of
+            type_.
+        classname (str): "@class" handled by decode. Defaults to the name of
+            type_.
+    """
+    if isinstance(type_, str):
+        default_module, _, default_classname = type_.rpartition(".")
+    elif isinstance(type_, type):
+        default_module, default_classname = type_.__module__, type_.__name__
+    else:
+        raise TypeError(f"Expected a type or a type name, got {type_!r}")
+
+    _ENCODERS[type_] = encode
+    if decode is not None:
+        _DECODERS[module or default_module, classname or default_classname] = decode
+    _find_encoder.cache_clear()
+    _resolve_class.cache_clear()
+
+
+@_TypeCache
+def _find_encoder(cls: type) -> Callable[[Any, json.JSONEncoder], Any] | None:
+    """Find the registered encoder for instances of cls.
+
+    The MRO of cls is walked from the most specific class, checking each
+    class both by type and by name. The result is cached per type.
+    """
+    for c in cls.__mro__:
+        encode = _ENCODERS.get(c) or _ENCODERS.get(f"{c.__module__}.{c.__qualname__}")
+        if encode is not None:
+            return encode
+    return None
+
+
 class MontyDecoder(json.JSONDecoder):
     """
     A Json Decoder which supports the MSONable API. By default, the
@@ -699,20 +1818,52 @@ class MontyDecoder(json.JSONDecoder):
 
         # Add it as a *cls* keyword when using json.load
         json.loads(json_string, cls=MontyDecoder)
+
+        # Only build nested MSONable objects when they are accessed
+        json.loads(json_string, cls=MontyDecoder, lazy=True)
     """
 
+    def __init__(self, *args, lazy: bool = False, **kwargs) -> None:
+        """
+        Args:
+            *args: Positional arguments passed to json.JSONDecoder.
+            lazy (bool): If True, nested dicts of classes with a from_dict
+                method are decoded into proxies, which call from_dict the
+                first time one of their attributes is accessed. The proxies
+                pass isinstance checks for the class they stand for. The
+                top-level object is always built.
+            **kwargs: Keyword arguments passed to json.JSONDecoder.
+        """
+        super().__init__(*args, **kwargs)
+        self._lazy = lazy
+
     def process_decoded(self, d):
         """
         Recursive method to support decoding dicts and lists containing
         pymatgen objects.
         """
+        if _DECODE_CONTEXT.get() is None:
+            # Top-level call: nested MSONable.from_dict calls reuse this decoder
+            with _decode_context(self):
+                obj = self.process_decoded(d)
+                if isinstance(obj, _LazyProxy):
+                    obj = obj._lazy_materialize()
+                return obj
+
         if isinstance(d, dict):
             if "@module" in d and "@class" in d:
-                modname = d["@module"]
-                classname = d["@class"]
-                if cls_redirect := MSONable.REDIRECT.get(modname, {}).get(classname):
-                    classname = cls_redirect["@class"]
-                    modname = cls_redirect["@module"]
+                if "@ref_id" in d:
+                    d = dict(d)
+                    ref_id = d.pop("@ref_id")
+                    refs = _DECODE_CONTEXT.get().refs  # type: ignore[union-attr]
+                    # Registered before decoding, so that cyclic references
+                    # to the object are recognized
+                    refs[ref_id] = _MISSING
+                    refs[ref_id] = obj = self.process_decoded(d)
+                    return obj
+                modname, classname, cls_, kind = _resolve_class(
+                    d["@module"], d["@class"]
+                )
 
             elif "@module" in d and "@callable" in d:
                 modname = d["@module"]
@@ -740,124 +1891,87 @@ class MontyDecoder(json.JSONDecoder):
                 except AttributeError:
                     pass
             else:
+                # Only documents written with track_refs define "@ref_id"s,
+                # "@ref" entries of other documents are left as they are
+                if (
+                    len(d) == 1
+                    and type(d.get("@ref")) is int
+                    and (refs := _DECODE_CONTEXT.get().refs)  # type: ignore[union-attr]
+                ):
+                    obj = refs.get(d["@ref"], _MISSING)
+                    if obj is _MISSING:
+                        raise MSONError(
+                            f"Reference {d['@ref']} does not refer to an object "
+                            "decoded before it. Cyclic references cannot be "
+                            "decoded."
+                        )
+                    return obj
                 modname = None
                 classname = None
 
             if classname:
-                if modname and modname not in {
-                    "bson.objectid",
-                    "numpy",
-                    "pandas",
-                    "pint",
-                    "torch",
-                }:
-                    if modname == "datetime" and classname == "datetime":
-                        try:
-                            # Remove timezone info in the form of "+xx:00"
-                            dt = datetime.datetime.strptime(
-                                d["string"].split("+")[0], "%Y-%m-%d %H:%M:%S.%f"
-                            )
-                        except ValueError:
-                            dt = datetime.datetime.strptime(
-                                d["string"].split("+")[0], "%Y-%m-%d %H:%M:%S"
-                            )
-                        return dt
-
-                    elif modname == "uuid" and classname == "UUID":
-                        return UUID(d["string"])
-
-                    elif modname == "pathlib" and classname == "Path":
-                        return Path(d["string"])
-
-                    mod = __import__(modname, globals(), locals(), [classname], 0)
-                    if hasattr(mod, classname):
-                        cls_ = getattr(mod, classname)
-                        data = {k: v for k, v in d.items() if not k.startswith("@")}
-                        if hasattr(cls_, "from_dict"):
-                            return cls_.from_dict(data)
-                        if issubclass(cls_, Enum):
-                            return cls_(d["value"])
-
-                        try:
-                            import pydantic
-
-                            if issubclass(cls_, pydantic.BaseModel):
-                                d = {
-                                    k: self.process_decoded(v) for k, v in data.items()
-                                }
-                                return cls_(**d)
-                        except ImportError:
-                            pass
-
-                        if (
-                            dataclasses is not None
-                            and (not issubclass(cls_, MSONable))
-                            and dataclasses.is_dataclass(cls_)
-                        ):
-                            d = {k: self.process_decoded(v) for k, v in data.items()}
-                            return cls_(**d)
-
-                elif modname == "torch" and classname == "Tensor":
-                    try:
-                        import torch  # import torch is very expensive
-
-                        if "Complex" in d["dtype"]:
-                            return torch.tensor(
-                                [
-                                    np.array(r) + np.array(i) * 1j
-                                    for r, i in zip(*d["data"])
-                                ],
-                            ).type(d["dtype"])
-                        return torch.tensor(d["data"]).type(d["dtype"])
-
-                    except ImportError:
-                        pass
-
-                elif modname == "numpy" and classname == "array":
-                    if d["dtype"].startswith("complex"):
-                        return np.array(
-                            [
-                                np.array(r) + np.array(i) * 1j
-                                for r, i in zip(*d["data"])
-                            ],
-                            dtype=d["dtype"],
+                decode = _DECODERS.get((modname, classname))
+                if decode is not None:
+                    obj = decode(d, self)
+                    if obj is not NotImplemented:
+                        return obj
+
+                if kind is not None:
+                    data = {k: v for k, v in d.items() if not k.startswith("@")}
+                    if kind == "from_dict":
+                        proxy_type = (
+                            _lazy_proxy_type(cls_)
+                            if self._lazy and isclass(cls_)
+                            else None
                         )
-                    return np.array(d["data"], dtype=d["dtype"])
-
-                elif modname == "pandas":
-                    import pandas as pd
-
-                    if classname == "DataFrame":
-                        decoded_data = MontyDecoder().decode(d["data"])
-                        return pd.DataFrame(decoded_data)
-                    if classname == "Series":
-                        decoded_data = MontyDecoder().decode(d["data"])
-                        return pd.Series(decoded_data)
-
-                elif modname == "pint":
-                    from pint import UnitRegistry
-
-                    ureg = UnitRegistry()
-
-                    if classname == "Quantity":
-                        return ureg.Quantity(d["data"])
-
-                elif (
-                    (bson is not None)
-                    and modname == "bson.objectid"
-                    and classname == "ObjectId"
-                ):
-                    return bson.objectid.ObjectId(d["oid"])
+                        if proxy_type is not None:
+                            return proxy_type(cls_, data, _DECODE_CONTEXT.get())
+                        return cls_.from_dict(data)
+                    if kind == "enum":
+                        return cls_(d["value"])
+                    # pydantic models and dataclasses
+                    return _get_decode_plan(cls_).build(data, self)
 
             return {
                 self.process_decoded(k): self.process_decoded(v) for k, v in d.items()
             }
 
         if isinstance(d, list):
+            if len(d) > 2 and type(d[0]) is dict and "@class" in d[0]:
+                first = self.process_decoded(d[0])
+                if _type_kind(type(first)) == "pydantic":
+                    objs = self._process_models(first, d)
+                    if objs is not None:
+                        return objs
+                return [first, *(self.process_decoded(x) for x in d[1:])]
             return [self.process_decoded(x) for x in d]
 
         return d
 
+    def _process_models(self, first: Any, items: list) -> list | None:
+        """Decode items in bulk if they are all serialized pydantic models of
+        the same class. first is the model decoded from items[0], which is
+        passed to the validation of the whole list so that errors report the
+        indices of items. Returns None if items are not such models."""
+        modname, classname = items[0].get("@module"), items[0]["@class"]
+        if modname is None:
+            return None
+        cls_, kind = _resolve_class(modname, classname)[2:]
+        if kind != "pydantic" or type(first) is not cls_:
+            return None
+        plan = _get_decode_plan(cls_)
+        if plan.validate is None:
+            return None
+        for item in items[1:]:
+            if (
+                type(item) is not dict
+                or item.get("@class") != classname
+                or item.get("@module") != modname
+                or "@ref_id" in item
+            ):
+                return None
+        return plan.build_many([first, *items[1:]], self)
+
     def decode(self, s):
         """
         Overrides decode from JSONDecoder.
@@ -865,10 +1979,13 @@ class MontyDecoder(json.JSONDecoder):
         :param s: string
         :return: Object.
         """
+        bson = _import_bson()
         if bson is not None:
             # need to pass `json_options` to ensure that datetimes are not
             # converted by BSON
-            d = json_util.loads(s, json_options=json_util.JSONOptions(tz_aware=True))
+            d = bson.json_util.loads(
+                s, json_options=bson.json_util.JSONOptions(tz_aware=True)
+            )
         elif orjson is not None:
             try:
                 d = orjson.loads(s)
@@ -879,12 +1996,560 @@ class MontyDecoder(json.JSONDecoder):
         return self.process_decoded(d)
 
 
+class _LazyProxy:
+    """Stand-in for an object decoded by MontyDecoder(lazy=True).
+
+    The object is built with from_dict on the first attribute access, and
+    all attribute accesses and the usual special methods are forwarded to
+    it. __class__ is the class of the object, so isinstance checks and
+    MontyEncoder treat the proxy like the object itself. Proxies are
+    instances of a subclass per proxied class, see _lazy_proxy_type.
+    """
+
+    __slots__ = ("_lazy_cls", "_lazy_data", "_lazy_context", "_lazy_obj")
+
+    def __init__(self, cls: type, data: dict, context: _DecodeContext) -> None:
+        object.__setattr__(self, "_lazy_cls", cls)
+        object.__setattr__(self, "_lazy_data", data)
+        object.__setattr__(self, "_lazy_context", context)
+        object.__setattr__(self, "_lazy_obj", _MISSING)
+
+    def _lazy_materialize(self) -> Any:
+        obj = object.__getattribute__(self, "_lazy_obj")
+        if obj is _MISSING:
+            cls = object.__getattribute__(self, "_lazy_cls")
+            data = object.__getattribute__(self, "_lazy_data")
+            # Decode in the context the proxy was created in, which holds the
+            # objects that "@ref" entries of data may refer to
+            token = _DECODE_CONTEXT.set(object.__getattribute__(self, "_lazy_context"))
+            try:
+                obj = cls.from_dict(data)
+            finally:
+                _DECODE_CONTEXT.reset(token)
+            object.__setattr__(self, "_lazy_obj", obj)
+            # The dict is not needed anymore
+            object.__setattr__(self, "_lazy_data", None)
+            object.__setattr__(self, "_lazy_context", None)
+        return obj
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        return object.__getattribute__(self, "_lazy_cls")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_materialize(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._lazy_materialize(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._lazy_materialize(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._lazy_materialize())
+
+
+def _lazy_forward(name: str):
+    def method(self, *args, **kwargs):
+        return getattr(self._lazy_materialize(), name)(*args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+# Special methods are looked up on the type, bypassing __getattr__
+_LAZY_SPECIAL_METHODS = (
+    "__repr__",
+    "__str__",
+    "__format__",
+    "__bytes__",
+    "__hash__",
+    "__bool__",
+    "__eq__",
+    "__ne__",
+    "__lt__",
+    "__le__",
+    "__gt__",
+    "__ge__",
+    "__len__",
+    "__iter__",
+    "__reversed__",
+    "__contains__",
+    "__getitem__",
+    "__setitem__",
+    "__delitem__",
+    "__call__",
+    "__enter__",
+    "__exit__",
+    "__reduce_ex__",
+)
+
+
+@_TypeCache
+def _lazy_proxy_type(cls: type) -> type[_LazyProxy] | None:
+    """Subclass of _LazyProxy for objects of class cls.
+
+    Only the special methods defined by cls are forwarded, so that e.g.
+    truth testing, len() and callable() behave as they do on the object.
+
+    Returns None for classes whose instances must not be proxied as they
+    are compared by identity: Enum members and the instances of classes
+    defining __new__, which may return interned objects.
+    """
+    if issubclass(cls, Enum) or cls.__new__ is not object.__new__:
+        return None
+    namespace: dict[str, Any] = {"__slots__": ()}
+    for name in _LAZY_SPECIAL_METHODS:
+        # Looked up in the MRO, getattr would find the methods of the metaclass
+        value = next((vars(c)[name] for c in cls.__mro__ if name in vars(c)), _MISSING)
+        if value is not _MISSING:
+            # __hash__ is None for unhashable classes
+            namespace[name] = None if value is None else _lazy_forward(name)
+    return type(f"_LazyProxy[{cls.__qualname__}]", (_LazyProxy,), namespace)
+
+
+def _encode_array_buffer(arr: np.ndarray, encoding: str) -> dict:
+    """Encode a numpy array as its raw buffer plus dtype, shape and byte order."""
+    import numpy as np
+
+    buffer = np.ascontiguousarray(arr).reshape(-1).view(np.uint8)
+    return {
+        "@module": "numpy",
+        "@class": "array",
+        "dtype": str(arr.dtype),
+        "shape": list(arr.shape),
+        "byteorder": arr.dtype.str[0],
+        "encoding": encoding,
+        "data": (
+            base64.b64encode(buffer.data).decode("ascii")
+            if encoding == "base64"
+            else buffer.tobytes()
+        ),
+    }
+
+
+def _decode_array_buffer(d: dict) -> np.ndarray:
+    """Rebuild a numpy array encoded by _encode_array_buffer."""
+    import numpy as np
+
+    data = d["data"]
+    if d["encoding"] == "base64":
+        data = base64.b64decode(data)
+    dtype = np.dtype(d["dtype"]).newbyteorder(d["byteorder"])
+    # Copy into a bytearray so that the returned array is writable
+    return np.frombuffer(bytearray(data), dtype=dtype).reshape(d["shape"])
+
+
+def _encode_datetime(o: datetime.datetime, encoder: json.JSONEncoder) -> dict:
+    return {"@module": "datetime", "@class": "datetime", "string": o.isoformat()}
+
+
+def _decode_datetime(d: dict, decoder: MontyDecoder) -> datetime.datetime:
+    try:
+        # Also parses the str(datetime) strings written by older versions,
+        # keeping the timezone offset if there is one
+        return datetime.datetime.fromisoformat(d["string"])
+    except ValueError:
+        pass
+    try:
+        # Remove timezone info in the form of "+xx:00"
+        return datetime.datetime.strptime(
+            d["string"].split("+")[0], "%Y-%m-%d %H:%M:%S.%f"
+        )
+    except ValueError:
+        return datetime.datetime.strptime(
+            d["string"].split("+")[0], "%Y-%m-%d %H:%M:%S"
+        )
+
+
+def _encode_uuid(o: UUID, encoder: json.JSONEncoder) -> dict:
+    return {"@module": "uuid", "@class": "UUID", "string": str(o)}
+
+
+def _decode_uuid(d: dict, decoder: MontyDecoder) -> UUID:
+    return UUID(d["string"])
+
+
+def _encode_path(o: Path, encoder: json.JSONEncoder) -> dict:
+    return {"@module": "pathlib", "@class": "Path", "string": str(o)}
+
+
+def _decode_path(d: dict, decoder: MontyDecoder) -> Path:
+    return Path(d["string"])
+
+
+def _encode_ndarray(o: np.ndarray, encoder: json.JSONEncoder) -> dict:
+    array_threshold = getattr(encoder, "_array_threshold", None)
+    if (
+        array_threshold is not None
+        and o.nbytes >= array_threshold
+        and o.dtype.kind not in "OV"
+    ):
+        return encoder._update_array_map(o)  # type: ignore[attr-defined]
+    array_encoding = getattr(encoder, "_array_encoding", "list")
+    if array_encoding != "list" and o.dtype.kind not in "OV":
+        return _encode_array_buffer(o, array_encoding)
+    if str(o.dtype).startswith("complex"):
+        return {
+            "@module": "numpy",
+            "@class": "array",
+            "dtype": str(o.dtype),
+            "data": [o.real.tolist(), o.imag.tolist()],
+        }
+    return {
+        "@module": "numpy",
+        "@class": "array",
+        "dtype": str(o.dtype),
+        "data": o.tolist(),
+    }
+
+
+def _decode_ndarray(d: dict, decoder: MontyDecoder) -> np.ndarray:
+    import numpy as np
+
+    if d.get("encoding") in {"base64", "bytes"}:
+        return _decode_array_buffer(d)
+    if d["dtype"].startswith("complex"):
+        return np.array(
+            [np.array(r) + np.array(i) * 1j for r, i in zip(*d["data"])],
+            dtype=d["dtype"],
+        )
+    return np.array(d["data"], dtype=d["dtype"])
+
+
+def _encode_numpy_scalar(o: np.generic, encoder: json.JSONEncoder) -> Any:
+    return o.item()
+
+
+def _encode_tensor(o, encoder: json.JSONEncoder) -> dict:
+    import torch  # already imported if there is a tensor to encode
+
+    # numpy cannot represent the lazy conjugation and negation of views
+    t = o.detach().cpu().resolve_conj().resolve_neg()
+    if t.dtype == torch.bfloat16:
+        # No numpy equivalent, float32 represents all bfloat16 values exactly
+        t = t.float()
+    # Always stored as a raw buffer, base64 unless the encoder writes bytes
+    array_encoding = getattr(encoder, "_array_encoding", "list")
+    return {
+        "@module": "torch",
+        "@class": "Tensor",
+        "dtype": o.type(),
+        "data": _encode_array_buffer(
+            t.numpy(), "bytes" if array_encoding == "bytes" else "base64"
+        ),
+    }
+
+
+def _decode_tensor(d: dict, decoder: MontyDecoder) -> Any:
+    try:
+        import torch  # import torch is very expensive
+    except ImportError:
+        return NotImplemented
+
+    if isinstance(d["data"], dict):
+        return torch.from_numpy(_decode_array_buffer(d["data"])).type(d["dtype"])
+
+    # Nested lists written by older versions
+    if "Complex" in d["dtype"]:
+        import numpy as np
+
+        return torch.tensor(
+            [np.array(r) + np.array(i) * 1j for r, i in zip(*d["data"])],
+        ).type(d["dtype"])
+    return torch.tensor(d["data"]).type(d["dtype"])
+
+
+# Extension dtypes whose values _encode_pandas_values stores as lists of
+# objects, which pd.array rebuilds from the dtype name
+_PANDAS_OBJECT_DTYPES = frozenset(
+    [f"{sign}Int{bits}Dtype" for sign in ("", "U") for bits in (8, 16, 32, 64)]
+    + ["Float32Dtype", "Float64Dtype", "BooleanDtype", "StringDtype"]
+    + ["DatetimeTZDtype"]
+)
+
+
+def _pandas_dtype_supported(dtype) -> bool:
+    """Whether _encode_pandas_values can encode values of dtype."""
+    import numpy as np
+
+    if isinstance(dtype, np.dtype):
+        return dtype.kind in "biufcmMO"
+    name = type(dtype).__name__
+    if name == "CategoricalDtype":
+        return dtype.categories is not None and _pandas_dtype_supported(
+            dtype.categories.dtype
+        )
+    if name == "IntervalDtype":
+        return dtype.subtype is not None and _pandas_dtype_supported(dtype.subtype)
+    return name == "PeriodDtype" or name in _PANDAS_OBJECT_DTYPES
+
+
+def _pandas_index_supported(index) -> bool:
+    if index.__class__.__name__ == "MultiIndex":
+        return all(_pandas_index_supported(level) for level in index.levels)
+    return _pandas_dtype_supported(index.dtype)
+
+
+def _encode_pandas_values(values) -> Any:
+    """Encodable form of the values of a pandas Series or Index.
+
+    Numeric and boolean values are returned as numpy arrays, so that they
+    are encoded like any other array (including the binary array encodings
+    of MontyEncoder). Datetimes and timedeltas are stored as int64 arrays,
+    periods as their int64 ordinals, categoricals as their codes, categories
+    and ordering and intervals as their bounds. The other supported
+    extension arrays (see _pandas_dtype_supported) are returned as lists of
+    objects, with their missing values (pd.NA, NaT) replaced by None.
+    """
+    import numpy as np
+
+    dtype = values.dtype
+    name = type(dtype).__name__
+    if name == "CategoricalDtype":
+        arr = values.array
+        return {
+            "codes": arr.codes,
+            "categories": _encode_pandas_index(arr.categories),
+            "ordered": bool(arr.ordered),
+        }
+    if name == "PeriodDtype":
+        return {"ordinals": values.array.asi8}
+    if name == "IntervalDtype":
+        arr = values.array
+        return {
+            "left": _encode_pandas_index(arr.left),
+            "right": _encode_pandas_index(arr.right),
+            "closed": arr.closed,
+        }
+    if not isinstance(dtype, np.dtype):
+        objects = values.astype(object)
+        return [
+            None if missing else value
+            for value, missing in zip(objects.tolist(), objects.isna().tolist())
+        ]
+    if dtype.kind in "biufc":
+        return values.to_numpy()
+    if dtype.kind in "mM":
+        return values.to_numpy().view("i8")
+    return values.tolist()
+
+
+def _decode_pandas_values(data: Any, dtype: str) -> Any:
+    """Rebuild the values encoded by _encode_pandas_values."""
+    import numpy as np
+    import pandas as pd
+    from pandas.api.types import pandas_dtype
+
+    if isinstance(data, dict):
+        if "codes" in data:
+            return pd.Categorical.from_codes(
+                np.asarray(data["codes"]),
+                categories=_decode_pandas_index(data["categories"]),
+                ordered=data["ordered"],
+            )
+        if "ordinals" in data:
+            return pd.arrays.PeriodArray(
+                np.asarray(data["ordinals"], dtype="i8"), dtype=pandas_dtype(dtype)
+            )
+        return pd.arrays.IntervalArray.from_arrays(
+            _decode_pandas_index(data["left"]),
+            _decode_pandas_index(data["right"]),
+            closed=data["closed"],
+        )
+
+    dtype_ = pandas_dtype(dtype)
+    if not isinstance(dtype_, np.dtype):
+        return pd.array(data, dtype=dtype_)
+    if dtype_.kind in "mM":
+        return np.asarray(data, dtype="i8").view(dtype_)
+    if dtype_.kind == "O":
+        # Filled element by element so nested lists are not turned into
+        # extra array dimensions
+        arr = np.empty(len(data), dtype=object)
+        for i, value in enumerate(data):
+            arr[i] = value
+        return arr
+    return np.asarray(data, dtype=dtype_)
+
+
+def _encode_pandas_index(index) -> dict:
+    if index.__class__.__name__ == "RangeIndex":
+        return {
+            "range": [index.start, index.stop, index.step],
+            "name": index.name,
+        }
+    if index.__class__.__name__ == "MultiIndex":
+        return {
+            "levels": [_encode_pandas_index(level) for level in index.levels],
+            "codes": list(index.codes),
+            "names": list(index.names),
+        }
+    d = {
+        "dtype": str(index.dtype),
+        "data": _encode_pandas_values(index),
+        "name": index.name,
+    }
+    if (
+        index.__class__.__name__ in {"DatetimeIndex", "TimedeltaIndex"}
+        and index.freq is not None
+    ):
+        d["freq"] = index.freqstr
+    return d
+
+
+def _decode_pandas_index(d: dict) -> Any:
+    import pandas as pd
+
+    if "range" in d:
+        return pd.RangeIndex(*d["range"], name=d["name"])
+    if "levels" in d:
+        return pd.MultiIndex(
+            levels=[_decode_pandas_index(level) for level in d["levels"]],
+            codes=d["codes"],
+            names=d["names"],
+        )
+    index = pd.Index(_decode_pandas_values(d["data"], d["dtype"]), name=d["name"])
+    if d.get("freq") is not None:
+        index = index.__class__(index, freq=d["freq"])
+    return index
+
+
+def _encode_dataframe(o, encoder: json.JSONEncoder) -> dict:
+    if not (
+        _pandas_index_supported(o.columns)
+        and _pandas_index_supported(o.index)
+        and all(_pandas_dtype_supported(dtype) for dtype in o.dtypes)
+    ):
+        return {
+            "@module": "pandas",
+            "@class": "DataFrame",
+            "data": o.to_json(default_handler=MontyEncoder().encode),
+        }
+    return {
+        "@module": "pandas",
+        "@class": "DataFrame",
+        "columns": _encode_pandas_index(o.columns),
+        "index": _encode_pandas_index(o.index),
+        "dtypes": [str(dtype) for dtype in o.dtypes],
+        "data": [_encode_pandas_values(o.iloc[:, i]) for i in range(o.shape[1])],
+    }
+
+
+def _decode_dataframe(d: dict, decoder: MontyDecoder) -> Any:
+    import pandas as pd
+
+    if isinstance(d["data"], str):
+        # Written with DataFrame.to_json, by older versions or for dtypes
+        # that are not encoded column by column
+        return pd.DataFrame(decoder.decode(d["data"]))
+
+    d = decoder.process_decoded({k: v for k, v in d.items() if k[0] != "@"})
+    index = _decode_pandas_index(d["index"])
+    # Columns are keyed by position as the labels need not be unique
+    df = pd.DataFrame(
+        {
+            i: _decode_pandas_values(data, dtype)
+            for i, (data, dtype) in enumerate(zip(d["data"], d["dtypes"]))
+        },
+        index=index,
+    )
+    df.columns = _decode_pandas_index(d["columns"])
+    return df
+
+
+def _encode_series(o, encoder: json.JSONEncoder) -> dict:
+    if not (_pandas_index_supported(o.index) and _pandas_dtype_supported(o.dtype)):
+        return {
+            "@module": "pandas",
+            "@class": "Series",
+            "data": o.to_json(default_handler=MontyEncoder().encode),
+        }
+    return {
+        "@module": "pandas",
+        "@class": "Series",
+        "name": o.name,
+        "index": _encode_pandas_index(o.index),
+        "dtype": str(o.dtype),
+        "data": _encode_pandas_values(o),
+    }
+
+
+def _decode_series(d: dict, decoder: MontyDecoder) -> Any:
+    import pandas as pd
+
+    if isinstance(d["data"], str):
+        # Written with Series.to_json, see _decode_dataframe
+        return pd.Series(decoder.decode(d["data"]))
+
+    d = decoder.process_decoded({k: v for k, v in d.items() if k[0] != "@"})
+    return pd.Series(
+        _decode_pandas_values(d["data"], d["dtype"]),
+        index=_decode_pandas_index(d["index"]),
+        name=d["name"],
+    )
+
+
+def _encode_quantity(o, encoder: json.JSONEncoder) -> dict:
+    d: dict[str, Any] = {
+        "@module": "pint",
+        "@class": "Quantity",
+        "data": str(o),
+    }
+    try:
+        module_version = import_module("pint").__version__
+        d["@version"] = str(module_version)
+    except (AttributeError, ImportError):
+        d["@version"] = None
+    return d
+
+
+def _decode_quantity(d: dict, decoder: MontyDecoder) -> Any:
+    from pint import UnitRegistry
+
+    return UnitRegistry().Quantity(d["data"])
+
+
+def _encode_objectid(o, encoder: json.JSONEncoder) -> dict:
+    return {"@module": "bson.objectid", "@class": "ObjectId", "oid": str(o)}
+
+
+def _decode_objectid(d: dict, decoder: MontyDecoder) -> Any:
+    bson = _import_bson()
+    if bson is None:
+        return NotImplemented
+    return bson.objectid.ObjectId(d["oid"])
+
+
+register_codec(datetime.datetime, _encode_datetime, _decode_datetime)
+register_codec(UUID, _encode_uuid, _decode_uuid)
+register_codec(Path, _encode_path, _decode_path, module="pathlib")
+register_codec("numpy.ndarray", _encode_ndarray, _decode_ndarray, classname="array")
+register_codec("numpy.generic", _encode_numpy_scalar)
+register_codec("torch.Tensor", _encode_tensor, _decode_tensor)
+register_codec(
+    "pandas.core.frame.DataFrame",
+    _encode_dataframe,
+    _decode_dataframe,
+    module="pandas",
+)
+register_codec(
+    "pandas.core.series.Series", _encode_series, _decode_series, module="pandas"
+)
+register_codec("pint.Quantity", _encode_quantity, _decode_quantity, module="pint")
+register_codec("bson.objectid.ObjectId", _encode_objectid, _decode_objectid)
+
+
 class MSONError(Exception):
     """
     Exception class for serialization errors.
     """
 
 
+# Types that jsanitize returns unchanged, whatever its arguments
+_JSON_PRIMITIVES = frozenset({str, int, float, bool, type(None)})
+
+
 def jsanitize(
     obj,
     strict=False,
@@ -927,11 +2592,14 @@ def jsanitize(
 
     if allow_bson and (
         isinstance(obj, (datetime.datetime, bytes))
-        or (bson is not None and isinstance(obj, bson.objectid.ObjectId))
+        or _check_type(obj, "bson.objectid.ObjectId")
     ):
         return obj
 
     if isinstance(obj, (list, tuple)):
+        # Fast path for the common case of lists of plain numbers/strings
+        if all(type(i) in _JSON_PRIMITIVES for i in obj):
+            return list(obj)
         return [
             jsanitize(
                 i,
@@ -943,7 +2611,11 @@ def jsanitize(
             for i in obj
         ]
 
-    if isinstance(obj, np.ndarray):
+    if _check_type(obj, "numpy.ndarray"):
+        # Arrays of these dtypes contain only JSON primitives once converted
+        # to lists: bool, (unsigned) int, float and unicode string
+        if obj.dtype.kind in "biufU":
+            return obj.tolist()
         try:
             return [
                 jsanitize(
@@ -958,17 +2630,12 @@ def jsanitize(
         except TypeError:
             return obj.tolist()
 
-    if isinstance(obj, np.generic):
+    if _check_type(obj, "numpy.generic"):
         return obj.item()
 
-    if _check_type(
-        obj,
-        (
-            "pandas.core.series.Series",
-            "pandas.core.frame.DataFrame",
-            "pandas.core.base.PandasObject",
-        ),
-    ):
+    kind = None if isclass(obj) else _type_kind(type(obj))
+
+    if kind == "pandas":
         return obj.to_dict()
 
     if isinstance(obj, dict):
@@ -1016,7 +2683,7 @@ def jsanitize(
     if isinstance(obj, str):
         return obj
 
-    if _check_type(obj, "pydantic.main.BaseModel"):
+    if kind == "pydantic":
         return jsanitize(
             MontyEncoder().default(obj),
             strict=strict,
@@ -1,25 +1,173 @@
 """
-msgpack serialization and deserialization utilities. Right now, this is a stub
-using monty.json encoder and decoders. The naming is just for clearer usage with
-msgpack's default and object_hook naming.
+msgpack serialization and deserialization utilities. Objects are encoded
+with the monty.json encoder and decoders, except numpy arrays, datetimes,
+UUIDs and paths which are stored as compact msgpack extension types. The
+naming is just for clearer usage with msgpack's default, object_hook and
+ext_hook naming.
 """
 
 from __future__ import annotations
 
-from monty.json import MontyDecoder, MontyEncoder
+import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+from uuid import UUID
 
+from monty.json import (
+    MontyDecoder,
+    MontyEncoder,
+    _check_type,
+    _decode_array_buffer,
+    _encode_array_buffer,
+)
 
-def default(obj: object) -> dict:
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+if TYPE_CHECKING:
+    from typing import BinaryIO, Iterator
+
+    import numpy as np
+
+# Shared by the module-level hooks, neither holds per-object state
+_ENCODER = MontyEncoder()
+_DECODER = MontyDecoder()
+
+# msgpack extension type codes
+_EXT_NDARRAY = 1
+_EXT_DATETIME = 2
+_EXT_UUID = 3
+_EXT_PATH = 4
+
+
+def default(obj: object) -> dict | msgpack.ExtType:
     """
     For use with msgpack.packb(obj, default=default). Supports Monty's as_dict
-    protocol, numpy arrays and datetime.
+    protocol, numpy arrays, datetime, UUID and Path.
     """
-    return MontyEncoder().default(obj)
+    return _default(obj, _ENCODER)
 
 
 def object_hook(d: dict) -> object:
     """
     For use with msgpack.unpackb(dict, object_hook=object_hook.).  Supports
-    Monty's as_dict protocol, numpy arrays and datetime.
+    Monty's as_dict protocol and the other objects supported by MontyDecoder.
+    """
+    return _DECODER.process_decoded(d)
+
+
+def ext_hook(code: int, data: bytes) -> object:
+    """
+    For use with msgpack.unpackb(data, ext_hook=ext_hook). Decodes the
+    extension types produced by default: numpy arrays, datetimes, UUIDs
+    and paths.
+    """
+    if code == _EXT_NDARRAY:
+        return _decode_array_buffer(msgpack.unpackb(data))
+    if code == _EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_UUID:
+        return UUID(bytes=data)
+    if code == _EXT_PATH:
+        return Path(data.decode("utf-8"))
+    return msgpack.ExtType(code, data)
+
+
+def _default(obj: object, encoder: MontyEncoder) -> dict | msgpack.ExtType:
+    if _check_type(obj, "numpy.ndarray"):
+        arr = cast("np.ndarray", obj)
+        if arr.dtype.kind not in "OV":
+            # The same layout as MontyEncoder(array_encoding="bytes")
+            return msgpack.ExtType(
+                _EXT_NDARRAY, msgpack.packb(_encode_array_buffer(arr, "bytes"))
+            )
+    if isinstance(obj, datetime.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("utf-8"))
+    if isinstance(obj, UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, Path):
+        return msgpack.ExtType(_EXT_PATH, str(obj).encode("utf-8"))
+    return encoder.default(obj)
+
+
+class Packer:
     """
-    return MontyDecoder().process_decoded(d)
+    A msgpack.Packer configured with Monty's hooks. A single encoder is used
+    for all packed objects. Usage::
+
+        packer = Packer()
+        with zopen("records.mpk.gz", "wb") as f:
+            for record in records:
+                f.write(packer.pack(record))
+    """
+
+    def __init__(self, encoder: MontyEncoder | None = None, **kwargs) -> None:
+        """
+        Args:
+            encoder (MontyEncoder): Encoder used for objects that msgpack does
+                not support natively. Defaults to a new MontyEncoder.
+            **kwargs: Keyword arguments passed to msgpack.Packer.
+        """
+        if msgpack is None:
+            raise RuntimeError("msgpack-python must be installed to use Packer.")
+        self.encoder = encoder or MontyEncoder()
+        kwargs.setdefault("default", self.default)
+        self._packer = msgpack.Packer(**kwargs)
+
+    def default(self, obj: object) -> dict | msgpack.ExtType:
+        """msgpack default hook, see monty.msgpack.default."""
+        return _default(obj, self.encoder)
+
+    def pack(self, obj: object) -> bytes:
+        """Pack obj into bytes."""
+        return self._packer.pack(obj)
+
+
+class Unpacker:
+    """
+    A msgpack.Unpacker configured with Monty's hooks. A single decoder is
+    used for all unpacked objects. Iterating over an Unpacker created from a
+    file object streams the records of a multi-record file::
+
+        with zopen("records.mpk.gz", "rb") as f:
+            for record in Unpacker(f):
+                ...
+    """
+
+    def __init__(
+        self,
+        file_like: BinaryIO | None = None,
+        decoder: MontyDecoder | None = None,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            file_like: File object to read from. If None, data has to be
+                provided with feed.
+            decoder (MontyDecoder): Decoder used for unpacked dicts. Defaults
+                to a new MontyDecoder.
+            **kwargs: Keyword arguments passed to msgpack.Unpacker.
+        """
+        if msgpack is None:
+            raise RuntimeError("msgpack-python must be installed to use Unpacker.")
+        self.decoder = decoder or MontyDecoder()
+        kwargs.setdefault("object_hook", self.object_hook)
+        kwargs.setdefault("ext_hook", ext_hook)
+        self._unpacker = msgpack.Unpacker(file_like, **kwargs)
+
+    def object_hook(self, d: dict) -> object:
+        """msgpack object_hook, see monty.msgpack.object_hook."""
+        return self.decoder.process_decoded(d)
+
+    def feed(self, data: bytes) -> None:
+        """Append data to the internal buffer."""
+        self._unpacker.feed(data)
+
+    def unpack(self) -> object:
+        """Unpack the next object."""
+        return self._unpacker.unpack()
+
+    def __iter__(self) -> Iterator[object]:
+        return iter(self._unpacker)
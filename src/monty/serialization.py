@@ -5,15 +5,19 @@ and yaml.
 
 from __future__ import annotations
 
+import codecs
+import io
 import json
 import os
+import re
+from collections import deque
+from functools import partial
 from typing import TYPE_CHECKING, TextIO, cast
 
-from ruamel.yaml import YAML
-
 from monty.io import zopen
-from monty.json import MontyDecoder, MontyEncoder
-from monty.msgpack import default, object_hook
+from monty.itertools import chunks
+from monty.json import MontyDecoder, MontyEncoder, dumps
+from monty.msgpack import default, ext_hook, object_hook
 
 try:
     import msgpack
@@ -21,14 +25,17 @@ except ImportError:
     msgpack = None
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
     from pathlib import Path
-    from typing import Any, Literal, TextIO, Union
+    from typing import IO, Any, Callable, Iterable, Iterator, Literal, TextIO, Union
+
+    from ruamel.yaml import YAML
 
 
 def loadfn(
     fn: Union[str, Path],
     *args,
-    fmt: Literal["json", "yaml", "mpk"] | None = None,
+    fmt: Literal["json", "jsonl", "yaml", "mpk"] | None = None,
     **kwargs,
 ) -> Any:
     """
@@ -39,13 +46,18 @@ def loadfn(
     detected from the file extension (case insensitive).
     YAML is assumed if the filename contains ".yaml" or ".yml".
     Msgpack is assumed if the filename contains ".mpk".
-    JSON is otherwise assumed.
+    JSON Lines is assumed if the filename contains ".jsonl", and a list of
+    all records is returned (see iter_jsonl to read them lazily).
+    JSON is assumed if the filename contains ".json". Otherwise, the format
+    is detected from the first bytes of the (decompressed) file: JSON if
+    they start with "{" or "[", msgpack if they are binary and YAML if
+    they are any other text.
 
     Args:
         fn (str/Path): filename or pathlib.Path.
         *args: Any of the args supported by json/yaml.load.
-        fmt ("json" | "yaml" | "mpk"): If specified, the fmt specified would
-            be used instead of autodetection from filename.
+        fmt ("json" | "jsonl" | "yaml" | "mpk"): If specified, the fmt
+            specified would be used instead of autodetection from filename.
         **kwargs: Any of the kwargs supported by json/yaml.load.
 
     Returns:
@@ -53,43 +65,60 @@ def loadfn(
     """
 
     if fmt is None:
-        basename = os.path.basename(fn).lower()
-        if ".mpk" in basename:
-            fmt = "mpk"
-        elif any(ext in basename for ext in (".yaml", ".yml")):
-            fmt = "yaml"
-        else:
-            fmt = "json"
+        fmt = _fmt_from_filename(fn)
 
-    if fmt == "mpk":
-        if msgpack is None:
-            raise RuntimeError(
-                "Loading of message pack files is not possible as msgpack-python is not installed."
+    if fmt is None:
+        with zopen(fn, mode="rb", sniff=True) as raw:
+            buffered = cast(
+                "io.BufferedReader",
+                raw
+                if hasattr(raw, "peek")
+                else io.BufferedReader(cast("io.RawIOBase", raw)),
             )
-        if "object_hook" not in kwargs:
-            kwargs["object_hook"] = object_hook
-        with zopen(fn, mode="rb") as fp:
-            return msgpack.load(fp, *args, **kwargs)  # pylint: disable=E1101
+            sniffed = _sniff_fmt(buffered.peek(_SNIFF_SIZE))
+            if sniffed == "mpk":
+                return _load_mpk(buffered, *args, **kwargs)
+            with io.TextIOWrapper(buffered, encoding="utf-8-sig") as text_fp:
+                return _load_text(text_fp, sniffed, *args, **kwargs)
+
+    if fmt == "jsonl":
+        return list(iter_jsonl(fn, *args, **kwargs))
+
+    if fmt == "mpk":
+        with zopen(fn, mode="rb", sniff=True) as fp:
+            return _load_mpk(cast("IO[bytes]", fp), *args, **kwargs)
     else:
         with zopen(fn, mode="rt", encoding="utf-8") as fp:
-            if fmt == "yaml":
-                if YAML is None:
-                    raise RuntimeError("Loading of YAML files requires ruamel.yaml.")
-                yaml = YAML()
-                return yaml.load(fp, *args, **kwargs)
-            if fmt == "json":
-                if "cls" not in kwargs:
-                    kwargs["cls"] = MontyDecoder
-                return json.load(fp, *args, **kwargs)
+            return _load_text(cast("IO[str]", fp), fmt, *args, **kwargs)
+
 
-            raise TypeError(f"Invalid format: {fmt}")
+def _load_mpk(fp: IO[bytes], *args, **kwargs) -> Any:
+    if msgpack is None:
+        raise RuntimeError(
+            "Loading of message pack files is not possible as msgpack-python is not installed."
+        )
+    if "object_hook" not in kwargs:
+        kwargs["object_hook"] = object_hook
+    if "ext_hook" not in kwargs:
+        kwargs["ext_hook"] = ext_hook
+    return msgpack.load(fp, *args, **kwargs)  # pylint: disable=E1101
+
+
+def _load_text(fp: IO[str], fmt: str, *args, **kwargs) -> Any:
+    if fmt == "yaml":
+        return _yaml().load(fp, *args, **kwargs)
+    if fmt == "json":
+        if "cls" not in kwargs:
+            kwargs["cls"] = MontyDecoder
+        return json.load(fp, *args, **kwargs)
+    raise TypeError(f"Invalid format: {fmt}")
 
 
 def dumpfn(
     obj: object,
     fn: Union[str, Path],
     *args,
-    fmt: Literal["json", "yaml", "mpk"] | None = None,
+    fmt: Literal["json", "jsonl", "yaml", "mpk"] | None = None,
     **kwargs,
 ) -> None:
     """
@@ -100,13 +129,15 @@ def dumpfn(
     detected from the file extension (case insensitive). YAML is assumed if the
     filename contains ".yaml" or ".yml".
     Msgpack is assumed if the filename contains ".mpk".
+    JSON Lines is assumed if the filename contains ".jsonl", in which case obj
+    must be an iterable of records (see dump_jsonl to append to a file).
     JSON is otherwise assumed.
 
     Args:
         obj (object): Object to dump.
         fn (str/Path): filename or pathlib.Path.
-        fmt ("json" | "yaml" | "mpk"): If specified, the fmt specified would
-            be used instead of autodetection from filename.
+        fmt ("json" | "jsonl" | "yaml" | "mpk"): If specified, the fmt
+            specified would be used instead of autodetection from filename.
         *args: Any of the args supported by json/yaml.dump.
         **kwargs: Any of the kwargs supported by json/yaml.dump.
 
@@ -114,15 +145,12 @@ def dumpfn(
         (object) Result of json.load.
     """
     if fmt is None:
-        basename = os.path.basename(fn).lower()
-        if ".mpk" in basename:
-            fmt = "mpk"
-        elif any(ext in basename for ext in (".yaml", ".yml")):
-            fmt = "yaml"
-        else:
-            fmt = "json"
+        fmt = _fmt_from_filename(fn) or "json"
 
-    if fmt == "mpk":
+    if fmt == "jsonl":
+        dump_jsonl(cast("Iterable", obj), fn, *args, **kwargs)
+
+    elif fmt == "mpk":
         if msgpack is None:
             raise RuntimeError(
                 "Loading of message pack files is not possible as msgpack-python is not installed."
@@ -136,13 +164,420 @@ def dumpfn(
             fp = cast(TextIO, fp)
 
             if fmt == "yaml":
-                if YAML is None:
-                    raise RuntimeError("Loading of YAML files requires ruamel.yaml.")
-                yaml = YAML()
-                yaml.dump(obj, fp, *args, **kwargs)
+                _yaml().dump(obj, fp, *args, **kwargs)
             elif fmt == "json":
                 if "cls" not in kwargs:
                     kwargs["cls"] = MontyEncoder
-                fp.write(json.dumps(obj, *args, **kwargs))
+                if issubclass(kwargs["cls"], MontyEncoder):
+                    fp.write(dumps(obj, *args, **kwargs))
+                else:
+                    fp.write(json.dumps(obj, *args, **kwargs))
             else:
                 raise TypeError(f"Invalid format: {fmt}")
+
+
+def dumpfn_many(
+    items: Iterable[tuple[object, Union[str, Path]]],
+    *args,
+    executor: Literal["process", "thread"] = "process",
+    max_workers: int | None = None,
+    **kwargs,
+) -> list[BaseException | None]:
+    """
+    Dump many objects to their own files with dumpfn, in parallel. Encoding,
+    compression and writing all happen in the workers. At most a few files
+    per worker are in flight at any time, so items may be a generator of
+    arbitrary length.
+
+    Args:
+        items (Iterable): (obj, fn) pairs, see dumpfn.
+        *args: Any of the args supported by dumpfn.
+        executor ("process" | "thread"): Use a process pool (default), which
+            requires the objects to be picklable, or a thread pool.
+        max_workers (int): Number of workers, defaults to the number of CPUs.
+        **kwargs: Any of the kwargs supported by dumpfn.
+
+    Returns:
+        list: For each item in input order, None if it was dumped or the
+            exception raised while dumping it. Errors do not stop the batch.
+    """
+    func = partial(_call_dumpfn, args, kwargs)
+    return list(_map_bounded(func, items, executor, max_workers))
+
+
+def loadfn_many(
+    fns: Iterable[Union[str, Path]],
+    *args,
+    executor: Literal["process", "thread"] = "process",
+    max_workers: int | None = None,
+    **kwargs,
+) -> Iterator[Any]:
+    """
+    Load many files with loadfn, in parallel. Reading, decompression and
+    decoding all happen in the workers. Results are yielded as soon as they
+    are available in input order, and at most a few files per worker are
+    loaded ahead of the consumer, which bounds memory use.
+
+    Args:
+        fns (Iterable): filenames or pathlib.Paths.
+        *args: Any of the args supported by loadfn.
+        executor ("process" | "thread"): Use a process pool (default), which
+            requires the loaded objects to be picklable, or a thread pool.
+        max_workers (int): Number of workers, defaults to the number of CPUs.
+        **kwargs: Any of the kwargs supported by loadfn.
+
+    Yields:
+        For each file in input order, the loaded object or the exception
+        raised while loading it. Errors do not stop the batch.
+    """
+    func = partial(_call_loadfn, args, kwargs)
+    yield from _map_bounded(func, ((fn,) for fn in fns), executor, max_workers)
+
+
+def _call_dumpfn(args: tuple, kwargs: dict, obj: object, fn: Union[str, Path]) -> None:
+    dumpfn(obj, fn, *args, **kwargs)
+
+
+def _call_loadfn(args: tuple, kwargs: dict, fn: Union[str, Path]) -> Any:
+    return loadfn(fn, *args, **kwargs)
+
+
+def _map_bounded(
+    func: Callable,
+    iterable: Iterable[tuple],
+    executor: Literal["process", "thread"],
+    max_workers: int | None,
+) -> Iterator[Any]:
+    """Run func(*args) for every args of iterable in a pool, keeping at most
+    a few tasks per worker pending. Results, or the exceptions raised, are
+    yielded in input order."""
+    if executor not in {"process", "thread"}:
+        raise ValueError(f"Unknown executor {executor!r}")
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    max_workers = max_workers or os.cpu_count() or 1
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    pool: Executor
+    with pool_cls(max_workers) as pool:
+        pending: deque[Future] = deque()
+        for args in iterable:
+            pending.append(pool.submit(func, *args))
+            if len(pending) >= 4 * max_workers:
+                yield _future_result(pending.popleft())
+        while pending:
+            yield _future_result(pending.popleft())
+
+
+def _future_result(future: Future) -> Any:
+    try:
+        return future.result()
+    except Exception as exc:
+        return exc
+
+
+def dump_jsonl(
+    records: Iterable,
+    fn: Union[str, Path],
+    *args,
+    append: bool = False,
+    **kwargs,
+) -> None:
+    """
+    Dump records to a JSON Lines file, one MontyEncoder-encoded record per
+    line. File may also be compressed, as supported by zopen.
+
+    Args:
+        records (Iterable): Records to dump.
+        fn (str/Path): filename or pathlib.Path.
+        *args: Any of the args supported by json.dumps.
+        append (bool): If True, records are appended to an existing file
+            instead of overwriting it. Compressed files are appended as a
+            new compressed stream, which gzip/bz2/xz readers handle
+            transparently.
+        **kwargs: Any of the kwargs supported by json.dumps, except indent.
+    """
+    if kwargs.get("indent") is not None:
+        raise ValueError("indent is not supported for JSON Lines")
+    encoder = kwargs.pop("cls", MontyEncoder)(*args, **kwargs)
+
+    with zopen(fn, mode="at" if append else "wt", encoding="utf-8") as fp:
+        fp = cast(TextIO, fp)
+        for record in records:
+            fp.write(encoder.encode(record))
+            fp.write("\n")
+
+
+def iter_jsonl(
+    fn: Union[str, Path],
+    *,
+    cls: type[MontyDecoder] = MontyDecoder,
+    nprocs: int = 1,
+    chunksize: int = 1000,
+) -> Iterator[Any]:
+    """
+    Lazily load the records of a JSON Lines file, decoded with MontyDecoder.
+    File may also be compressed, as supported by zopen. Blank lines are
+    skipped.
+
+    Args:
+        fn (str/Path): filename or pathlib.Path.
+        cls (MontyDecoder): Decoder class used to decode each record.
+        nprocs (int): Number of worker processes used to parse and decode
+            records. With nprocs > 1, lines are read in batches of
+            nprocs * chunksize and decoded in parallel, so decoded records
+            must be picklable.
+        chunksize (int): Number of lines sent to a worker at a time.
+
+    Yields:
+        Decoded records, in file order.
+    """
+    with zopen(fn, mode="rt", encoding="utf-8") as fp:
+        lines = (line for line in fp if line.strip())
+        if nprocs == 1:
+            decoder = cls()
+            for line in lines:
+                yield decoder.decode(line)
+            return
+
+        import multiprocessing
+
+        decode = partial(_decode_json_line, cls)
+        with multiprocessing.Pool(nprocs) as pool:
+            for batch in chunks(lines, nprocs * chunksize):
+                yield from pool.map(decode, batch, chunksize=chunksize)
+
+
+def _decode_json_line(cls: type[MontyDecoder], line: str) -> Any:
+    return cls().decode(line)
+
+
+def _yaml() -> YAML:
+    """A new ruamel.yaml YAML instance. ruamel.yaml is imported on first use
+    as it is slow to import."""
+    try:
+        from ruamel.yaml import YAML
+    except ImportError:
+        raise RuntimeError("Loading of YAML files requires ruamel.yaml.") from None
+    return YAML()
+
+
+# The .jsonl extension, optionally followed by one of the compression
+# extensions of zopen. Not a substring test, as ".jsonld" is JSON-LD.
+_JSONL_RE = re.compile(r"\.jsonl(\.(bz2|gz|z|xz|lzma|zst))?$")
+
+
+def _fmt_from_filename(
+    fn: Union[str, Path],
+) -> Literal["json", "jsonl", "yaml", "mpk"] | None:
+    """Guess the serialization format from a filename, None if unknown."""
+    basename = os.path.basename(fn).lower()
+    if ".mpk" in basename:
+        return "mpk"
+    if any(ext in basename for ext in (".yaml", ".yml")):
+        return "yaml"
+    if _JSONL_RE.search(basename):
+        return "jsonl"
+    if ".json" in basename:
+        return "json"
+    return None
+
+
+# Number of leading bytes looked at by _sniff_fmt
+_SNIFF_SIZE = 64
+
+
+def _sniff_fmt(head: bytes) -> Literal["json", "yaml", "mpk"]:
+    """Guess the serialization format from the first bytes of a file."""
+    head = head[:_SNIFF_SIZE].removeprefix(b"\xef\xbb\xbf").lstrip()
+    if head[:1] in {b"{", b"["}:
+        return "json"
+    # msgpack maps and arrays start with 0x80-0x9f or 0xdc-0xdf, which are
+    # (almost) never the first byte of UTF-8 text. Other binary content is
+    # assumed to be msgpack too.
+    if head and (0x80 <= head[0] <= 0x9F or 0xDC <= head[0] <= 0xDF):
+        return "mpk"
+    try:
+        # Incremental, as head may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+    except UnicodeDecodeError:
+        return "mpk"
+    return "yaml"
+
+
+def iter_loadfn(
+    fn: Union[str, Path],
+    path: str = "item",
+    *,
+    cls: type[MontyDecoder] = MontyDecoder,
+    chunk_size: int = 1 << 16,
+) -> Iterator[Any]:
+    """
+    Incrementally load the elements of a JSON array from a file. File may
+    be compressed, as supported by zopen. Elements are parsed and decoded
+    with the MontyDecoder one at a time as they are read, so memory usage is
+    bounded by the size of the largest single element rather than the size
+    of the file.
+
+    Args:
+        fn (str/Path): filename or pathlib.Path.
+        path (str): Location of the array in the document, as dot-separated
+            object keys followed by "item" (the same convention as ijson
+            prefixes). "item" iterates over a top-level array and
+            "docs.item" over the array stored under the top-level "docs"
+            key.
+        cls (MontyDecoder): Decoder class used to decode each element.
+        chunk_size (int): Number of characters read from the file at a time.
+
+    Yields:
+        Decoded array elements, in order.
+    """
+    *keys, item = path.split(".")
+    if item != "item":
+        raise ValueError(f"path must end with 'item', got {path!r}")
+
+    decoder = cls()
+    with zopen(fn, mode="rt", encoding="utf-8") as fp:
+        stream = _JSONStream(cast(TextIO, fp), chunk_size)
+        for key in keys:
+            stream.find_key(key)
+
+        stream.expect("[")
+        if stream.peek() == "]":
+            return
+        while True:
+            yield decoder.process_decoded(stream.read_value())
+            if stream.expect(",]") == "]":
+                return
+
+
+class _JSONStream:
+    """Minimal pull parser reading one JSON value at a time from a text file."""
+
+    _WHITESPACE = re.compile(r"[ \t\n\r]*")
+    _NUMBER_DELIMITERS = frozenset(",]} \t\n\r")
+    # Characters that matter when skipping a value, outside and inside strings
+    _STRUCTURAL = re.compile(r'["\[\]{}]')
+    _STRING_SPECIAL = re.compile(r'["\\]')
+
+    def __init__(self, fp: TextIO, chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        """Read up to size more characters, return False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop the consumed part of the buffer
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of file)."""
+        while True:
+            # The pattern always matches, possibly the empty string
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(
+                f"Expecting one of {chars!r}", self._buffer, self._pos
+            )
+        self._pos += 1
+        return char
+
+    def read_value(self) -> Any:
+        """Parse and consume the next JSON value."""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete value, read more (in growing chunks so that
+                # large values are not re-parsed too many times)
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number cut by the end of the buffer (e.g. "1." or "1e") may
+            # continue in the next chunk, so it is only complete once it is
+            # followed by a delimiter
+            if (
+                isinstance(obj, (int, float))
+                and not isinstance(obj, bool)
+                and self._buffer[end : end + 1] not in self._NUMBER_DELIMITERS
+                and self._fill(size)
+            ):
+                continue
+            self._pos = end
+            return obj
+
+    def skip_value(self) -> None:
+        """Consume the next JSON value without building it.
+
+        Objects, arrays and strings are skipped by scanning for brackets and
+        quotes, so that only one chunk of them is held in memory at a time.
+        The skipped value is not validated.
+        """
+        if self.peek() not in '{["':
+            # Numbers, booleans and null are short
+            self.read_value()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            pattern = self._STRING_SPECIAL if in_string else self._STRUCTURAL
+            match = pattern.search(self._buffer, self._pos)
+            if match is None or (
+                # The escaped character is not read yet
+                match.group() == "\\" and match.end() == len(self._buffer)
+            ):
+                self._pos = len(self._buffer) if match is None else match.start()
+                if not self._fill(self._chunk_size):
+                    raise json.JSONDecodeError(
+                        "Unterminated value", self._buffer, self._pos
+                    )
+                continue
+            char = match.group()
+            self._pos = match.end()
+            if char == "\\":
+                self._pos += 1
+            elif char == '"':
+                in_string = not in_string
+                if not in_string and depth == 0:
+                    return
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def find_key(self, key: str) -> None:
+        """Advance into the object value stored under key."""
+        self.expect("{")
+        if self.peek() != "}":
+            while True:
+                name = self.read_value()
+                self.expect(":")
+                if name == key:
+                    return
+                self.skip_value()
+                if self.expect(",}") == "}":
+                    break
+        raise KeyError(key)
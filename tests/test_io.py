@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import bz2
 import gzip
+import io
+import lzma
 import os
+import tarfile
 import warnings
 from pathlib import Path
 
@@ -19,6 +22,11 @@ from monty.io import (
 )
 from monty.tempfile import ScratchDir
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 TEST_DIR = os.path.join(os.path.dirname(__file__), "test_files")
 
 
@@ -372,7 +380,20 @@ class TestReverseReadfile:
 
 
 class TestZopen:
-    @pytest.mark.parametrize("extension", [".txt", ".bz2", ".gz", ".xz", ".lzma"])
+    @pytest.mark.parametrize(
+        "extension",
+        [
+            ".txt",
+            ".bz2",
+            ".gz",
+            ".xz",
+            ".lzma",
+            pytest.param(
+                ".zst",
+                marks=pytest.mark.skipif(zstandard is None, reason="no zstandard"),
+            ),
+        ],
+    )
     def test_read_write_files(self, extension):
         """Test read/write in binary/text mode:
         - uncompressed text file: .txt
@@ -396,6 +417,81 @@ class TestZopen:
             with zopen(filename, "rb") as f:
                 assert f.read() == content.encode()
 
+    @pytest.mark.parametrize(
+        "compress",
+        [
+            gzip.compress,
+            bz2.compress,
+            lzma.compress,
+            pytest.param(
+                getattr(zstandard, "compress", None),
+                marks=pytest.mark.skipif(zstandard is None, reason="no zstandard"),
+            ),
+        ],
+    )
+    def test_sniff_compression(self, compress, tmp_path):
+        """Compressed files without a matching extension are detected from
+        their magic number when reading."""
+        content = "This is a test file.\n"
+        for name in ("misnamed.txt", "no_extension"):
+            filename = tmp_path / name
+            filename.write_bytes(compress(content.encode()))
+
+            with zopen(filename, "rt", encoding="utf-8") as f:
+                assert f.read() == content
+            with zopen(str(filename), "rb", sniff=True) as f:
+                assert f.read() == content.encode()
+            # Binary mode reads the raw bytes by default
+            with zopen(filename, "rb") as f:
+                assert f.read() == compress(content.encode())
+            with zopen(filename, "rt", encoding="latin-1", sniff=False) as f:
+                assert f.read() != content
+
+    def test_archives_read_raw(self, tmp_path):
+        """Archives opened in binary mode, e.g. to hand them to tarfile, are
+        not decompressed behind the caller's back."""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            tar.addfile(tarfile.TarInfo("empty"))
+        filename = tmp_path / "x.tgz"
+        filename.write_bytes(buffer.getvalue())
+
+        with zopen(filename, "rb") as f:
+            assert f.read() == buffer.getvalue()
+        with zopen(filename, "rb") as f, tarfile.open(fileobj=f) as tar:
+            assert tar.getnames() == ["empty"]
+
+        # ".gz" files are decompressed by their extension, as they always were
+        filename = tmp_path / "x.tar.gz"
+        filename.write_bytes(buffer.getvalue())
+        with zopen(filename, "rb") as f:
+            assert f.read() == gzip.decompress(buffer.getvalue())
+
+    def test_sniff_uncompressed(self, tmp_path):
+        filename = tmp_path / "plain"
+        filename.write_bytes(b"\x1f")
+
+        with zopen(filename, "rb") as f:
+            assert f.read() == b"\x1f"
+
+        filename.write_text("line 1\r\nline 2\n", encoding="utf-8")
+        with zopen(filename, "rt", encoding="utf-8") as f:
+            assert f.mode == "rt"
+            assert f.readlines() == ["line 1\n", "line 2\n"]
+        assert f.closed
+        with zopen(filename, "rt", encoding="utf-8", newline="") as f:
+            assert f.readline() == "line 1\r\n"
+
+        # Text starting like a bz2 header is not mistaken for one
+        filename.write_text("BZh, not bzip2\n", encoding="utf-8")
+        with zopen(filename, "rt", encoding="utf-8") as f:
+            assert f.read() == "BZh, not bzip2\n"
+
+        # Writing is not affected
+        with zopen(filename, "wb") as f:
+            f.write(gzip.compress(b"data"))
+        assert filename.read_bytes()[:2] == b"\x1f\x8b"
+
     def test_lzw_files(self):
         """gzip is not really able to (de)compress LZW files.
 
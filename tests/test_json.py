@@ -2,23 +2,43 @@ from __future__ import annotations
 
 import dataclasses
 import datetime
+import gc
+import gzip
 import json
+import math
 import os
 import pathlib
+import pickle
+import shutil
+import subprocess
+import sys
+import weakref
 from enum import Enum
-from typing import Union
+from typing import Literal, Optional, Union
 
 import numpy as np
 import pytest
 
+import monty.json
 from monty.json import (
+    REDIRECTS,
     MontyDecoder,
     MontyEncoder,
     MSONable,
+    MSONError,
+    RedirectRegistry,
     _check_type,
+    _DecodePlan,
+    _get_decode_plan,
+    _is_primitive_annotation,
     _load_redirect,
+    _resolve_class,
+    _type_kind,
+    clear_class_cache,
+    dumps,
     jsanitize,
     load,
+    register_codec,
 )
 
 from . import __version__ as TESTS_VERSION
@@ -71,6 +91,39 @@ class GoodMSONClass(MSONable):
         )
 
 
+class StateMSONClass(MSONable):
+    """as_dict returns the dict the object is built from."""
+
+    def __init__(self, state):
+        self.state = state
+
+    def as_dict(self):
+        return self.state
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d)
+
+
+class ExtraMSONClass(MSONable):
+    """from_dict removes a key that __init__ does not take."""
+
+    def __init__(self, a, extra=None):
+        self.a = a
+        self.extra = extra
+
+    def as_dict(self):
+        return {**super().as_dict(), "other": self.extra}
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        other = d.pop("other")
+        obj = super().from_dict(d)
+        obj.extra = other
+        return obj
+
+
 class GoodNOTMSONClass:
     """Literally the same as the GoodMSONClass, except it does not have
     the MSONable inheritance!"""
@@ -176,6 +229,16 @@ class EnumTest(MSONable, Enum):
     b = 2
 
 
+class InternedMSONClass(MSONable):
+    instances: dict = {}
+
+    def __new__(cls, name):
+        return cls.instances.setdefault(name, super().__new__(cls))
+
+    def __init__(self, name):
+        self.name = name
+
+
 class ClassContainingDataFrame(MSONable):
     def __init__(self, df):
         self.df = df
@@ -315,6 +378,82 @@ class TestMSONable:
             obj.unsafe_hash().hexdigest() == "44204c8da394e878f7562c9aa2e37c2177f28b81"
         )
 
+    def test_content_hash(self):
+        GMC = GoodMSONClass
+        obj = GoodNestedMSONClass(
+            a_list=[GMC(1, 1.0, "one"), GMC(2, np.arange(3), "two")],
+            b_dict={"first": GMC(3, datetime.datetime(2020, 1, 1), "three")},
+            c_list_dict_list=[{"list1": [GMC(5, (5, "5"), "five")]}],
+        )
+        digest = obj.content_hash()
+        assert len(digest) == 128
+        assert obj.content_hash("sha256") != digest[:64]
+        assert len(obj.content_hash("sha256")) == 64
+
+        # Independent of dict ordering, versions and JSON round trips
+        reordered = GoodNestedMSONClass(
+            c_list_dict_list=obj._c_list_dict_list,
+            b_dict=obj.b_dict,
+            a_list=obj.a_list,
+        )
+        assert reordered.content_hash() == digest
+        assert json.loads(obj.to_json(), cls=MontyDecoder).content_hash() == digest
+        # Including non-string keys, which JSON converts to strings
+        keyed = GMC(1, {True: 1, False: 2, None: 3, 2.5: 4, 7: 5}, "a")
+        assert (
+            json.loads(keyed.to_json(), cls=MontyDecoder).content_hash()
+            == keyed.content_hash()
+        )
+
+        # Sensitive to values and to their types
+        assert GMC(1, 1.0, "one").content_hash() != GMC(1, 1, "one").content_hash()
+        assert GMC(1, "1", "one").content_hash() != GMC(1, 1, "one").content_hash()
+        assert GMC(1, [1], "a").content_hash() != GMC(1, [[1]], "a").content_hash()
+        arr = np.arange(4)
+        assert (
+            GMC(1, arr, "a").content_hash()
+            != GMC(1, arr.reshape(2, 2), "a").content_hash()
+        )
+        assert (
+            GMC(1, arr, "a").content_hash()
+            != GMC(1, arr.astype("int32"), "a").content_hash()
+        )
+
+        # Memoized digests are stored per algorithm
+        obj.a_list[0].a = 42
+        memoized = obj.content_hash(memoize=True)
+        assert memoized != digest
+        obj.a_list[0].a = 1
+        assert obj.content_hash(memoize=True) == memoized
+        assert obj.content_hash() == digest
+        assert obj.content_hash("md5", memoize=True) != memoized
+
+        with pytest.raises(ValueError):
+            obj.content_hash("no-such-hash")
+
+    def test_as_dict_plan(self):
+        obj = self.good_cls("Hello", "World", "Python")
+        d = obj.as_dict()
+        plan = GoodMSONClass.__dict__["_as_dict_plan"]
+        assert plan.version == TESTS_VERSION
+        assert [name for name, _ in plan.args] == ["a", "b", "c", "d"]
+        assert plan.varargs == "values"
+        # The plan is reused by subsequent calls
+        assert obj.as_dict() == d
+        assert GoodMSONClass.__dict__["_as_dict_plan"] is plan
+
+        # Subclasses get their own plan
+        class SubClass(GoodMSONClass):
+            def __init__(self, a, e):
+                super().__init__(a, e, e)
+                self.e = e
+
+        sub_d = SubClass(1, 2).as_dict()
+        assert sub_d["@class"] == "SubClass"
+        assert {"a", "e"} <= set(sub_d)
+        assert "b" not in sub_d
+        assert SubClass.__dict__["_as_dict_plan"] is not plan
+
     def test_version(self):
         obj = self.good_cls("Hello", "World", "Python")
         d = obj.as_dict()
@@ -367,6 +506,46 @@ class TestMSONable:
         assert len(obj.a_list) == len(obj4.a_list)
         assert len(obj.b_dict) == len(obj4.b_dict)
 
+    def test_from_dict_decode_context(self, monkeypatch):
+        GMC = GoodMSONClass
+        obj = GoodNestedMSONClass(
+            a_list=[GMC(1, 1.0, "one"), GMC(2, 2.0, "two")],
+            b_dict={"first": GMC(3, 3.0, "three")},
+            c_list_dict_list=[{"list1": [GMC(5, 5.0, "five")]}],
+        )
+        d = json.loads(obj.to_json())
+
+        n_decoders = 0
+        init = MontyDecoder.__init__
+
+        def counting_init(self, *args, **kwargs):
+            nonlocal n_decoders
+            n_decoders += 1
+            init(self, *args, **kwargs)
+
+        monkeypatch.setattr(MontyDecoder, "__init__", counting_init)
+        obj2 = GoodNestedMSONClass.from_dict(d)
+        assert isinstance(obj2.a_list[1], GMC)
+        assert isinstance(obj2._c_list_dict_list[0]["list1"][0], GMC)
+        assert n_decoders == 1
+
+        # Nested from_dict calls use the decoder that started the decoding
+        class TaggingDecoder(MontyDecoder):
+            def process_decoded(self, d):
+                if d == "five":
+                    return "FIVE"
+                return super().process_decoded(d)
+
+        obj3 = TaggingDecoder().process_decoded(d)
+        assert obj3._c_list_dict_list[0]["list1"][0]._c == "FIVE"
+
+    def test_from_dict_override(self):
+        obj = ExtraMSONClass(1, extra=2)
+        obj2 = ExtraMSONClass.from_dict(obj.as_dict())
+        assert (obj2.a, obj2.extra) == (1, 2)
+        obj3 = json.loads(json.dumps([obj], cls=MontyEncoder), cls=MontyDecoder)[0]
+        assert (obj3.a, obj3.extra) == (1, 2)
+
     def test_enum_serialization(self):
         e = EnumTest.a
         d = e.as_dict()
@@ -409,6 +588,114 @@ class TestMSONable:
         f = jsanitize(d, enum_values=True)
         assert f["123"] == "value_a"
 
+    def test_lazy_decode(self, monkeypatch, tmp_path):
+        GMC = GoodMSONClass
+        obj = GoodNestedMSONClass(
+            a_list=[GMC(1, 1.0, "one"), GMC(2, GMC(3, 3.0, "three"), "two")],
+            b_dict={"first": GMC(4, 4.0, "four")},
+            c_list_dict_list=[{"list": []}],
+        )
+        s = obj.to_json()
+        eager = json.loads(s, cls=MontyDecoder)
+
+        built = []
+        from_dict = GMC.from_dict.__func__
+
+        def counting_from_dict(cls, d):
+            built.append(d["a"])
+            return from_dict(cls, d)
+
+        monkeypatch.setattr(GMC, "from_dict", classmethod(counting_from_dict))
+
+        obj2 = json.loads(s, cls=MontyDecoder, lazy=True)
+        assert type(obj2) is GoodNestedMSONClass
+        assert built == []
+
+        first = obj2.a_list[1]
+        assert isinstance(first, GMC)
+        assert built == []
+        assert first.a == 2
+        assert built == [2]
+        # Nested objects are built lazily too, and only once
+        assert isinstance(first.b, GMC)
+        assert first.b._c == "three"
+        assert first.a == 2
+        assert built == [2, 3]
+
+        assert obj2.b_dict["first"] == eager.b_dict["first"]
+        assert obj2.as_dict() == obj.as_dict()
+        assert json.loads(json.dumps(obj2, cls=MontyEncoder)) == json.loads(s)
+        assert sorted(built) == [1, 2, 3, 4]
+
+        # Special methods and attribute assignment reach the object
+        proxy = MontyDecoder(lazy=True).process_decoded([json.loads(s)])[0]
+        assert "GoodNestedMSONClass" in repr(proxy)
+        assert proxy
+        assert not callable(proxy)
+        with pytest.raises(TypeError):
+            len(proxy)
+        proxy.extra = 1
+        assert proxy.extra == 1
+        assert pickle.loads(pickle.dumps(proxy)).as_dict() == obj.as_dict()
+
+        obj.save(tmp_path / "lazy.json")
+        built.clear()
+        loaded = GoodNestedMSONClass.load(tmp_path / "lazy.json", lazy=True)
+        assert built == []
+        assert loaded.b_dict["first"].a == 4
+        assert built == [4]
+        assert load(tmp_path / "lazy.json", lazy=True).a_list[0].b == 1.0
+
+    def test_lazy_decode_identity(self):
+        """Enum members and interned objects are not proxied, so that they
+        keep their identity."""
+        obj = GoodMSONClass(EnumTest.a, InternedMSONClass("x"), [EnumTest.b])
+        decoded = MontyDecoder(lazy=True).process_decoded([json.loads(obj.to_json())])
+        assert decoded[0].a is EnumTest.a
+        assert decoded[0].b is InternedMSONClass("x")
+        assert decoded[0]._c[0] is EnumTest.b
+        assert {EnumTest.a: 1}[decoded[0].a] == 1
+
+    def test_track_refs(self):
+        shared = GoodMSONClass(1, [1.5] * 100, "c")
+        obj = GoodNestedMSONClass(
+            a_list=[shared, shared], b_dict={"x": shared}, c_list_dict_list=[{"y": []}]
+        )
+        data = [obj, shared, GoodMSONClass(1, [1.5] * 100, "c")]
+
+        s = json.dumps(data, cls=MontyEncoder, track_refs=True)
+        assert s.count('"@class": "GoodMSONClass"') == 2
+        assert len(s) < len(json.dumps(data, cls=MontyEncoder)) / 2
+        assert json.loads(dumps(data, track_refs=True)) == json.loads(s)
+        decoded = json.loads(s, cls=MontyDecoder)
+        assert decoded[0].a_list[0] is decoded[0].a_list[1]
+        assert decoded[0].a_list[0] is decoded[0].b_dict["x"] is decoded[1]
+        assert decoded[1].b == decoded[2].b == shared.b
+        assert decoded[2] is not decoded[1]
+
+        # from_dict and lazy decoding restore shared objects as well
+        d = json.loads(json.dumps(obj, cls=MontyEncoder, track_refs=True))
+        decoded = GoodNestedMSONClass.from_dict(d)
+        assert decoded.a_list[0] is decoded.b_dict["x"]
+        decoded = MontyDecoder(lazy=True).process_decoded(d)
+        assert decoded.a_list[1].b == shared.b
+        assert decoded.a_list[0] is decoded.b_dict["x"]
+
+        # Cycles are serialized once but cannot be decoded
+        cyclic = GoodMSONClass(1, 2, 3)
+        cyclic.b = cyclic
+        d = json.loads(json.dumps(cyclic, cls=MontyEncoder, track_refs=True))
+        assert d["b"] == {"@ref": 0}
+        with pytest.raises(MSONError, match="Cyclic references"):
+            MontyDecoder().process_decoded(d)
+
+        with pytest.raises(ValueError, match="sort_keys"):
+            json.dumps(obj, cls=MontyEncoder, track_refs=True, sort_keys=True)
+
+        # "@ref" entries of documents without tracked references are data
+        for s in ('{"@ref": "#/definitions/x"}', '[{"@ref": 0}]'):
+            assert json.loads(s, cls=MontyDecoder) == json.loads(s)
+
     def test_save_load(self, tmp_path):
         """Tests the save and load serialization methods."""
 
@@ -471,6 +758,121 @@ class TestMSONable:
         assert test_good_class == test_good_class2
         assert test_good_class == test_good_class3
 
+    def test_save_load_arrays(self, tmp_path):
+        big = np.arange(1000, dtype=np.float64).reshape(10, 100)
+        obj = ClassContainingNumpyArray(
+            np_a={"big": big, "small": np.arange(3), "nested": [big[0]]}
+        )
+        target = tmp_path / "arrays.json"
+        obj.save(target, array_threshold=800)
+
+        names = sorted(p.name for p in tmp_path.iterdir())
+        assert len(names) == 3
+        assert names[2] == "arrays.json"
+        with open(target, encoding="utf-8") as f:
+            d = json.load(f)
+        assert names[0] == f"arrays.{d['np_a']['big']['@array_reference']}.npy"
+        assert names[1] == f"arrays.{d['np_a']['nested'][0]['@array_reference']}.npy"
+        assert d["np_a"]["small"]["data"] == [0, 1, 2]
+
+        # The arrays of the replaced json file are removed
+        obj.save(target, array_threshold=800, strict=False)
+        assert len(list(tmp_path.iterdir())) == 3
+        assert names != sorted(p.name for p in tmp_path.iterdir())
+        for loaded in (ClassContainingNumpyArray.load(target), load(target)):
+            assert isinstance(loaded.np_a["big"], np.memmap)
+            assert np.array_equal(loaded.np_a["big"], big)
+            assert np.array_equal(loaded.np_a["nested"][0], big[0])
+            assert np.array_equal(loaded.np_a["small"], np.arange(3))
+
+        loaded = load(target, mmap_mode=None)
+        assert not isinstance(loaded.np_a["big"], np.memmap)
+        assert np.array_equal(loaded.np_a["big"], big)
+
+    def test_save_arrays_atomic(self, tmp_path, monkeypatch):
+        target = tmp_path / "arrays.json"
+        ClassContainingNumpyArray(np_a={"x": np.zeros(1000)}).save(
+            target, array_threshold=800
+        )
+
+        # A save interrupted before the json file is renamed leaves the old
+        # json file with its arrays
+        replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith(".json"):
+                raise OSError("disk full")
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", failing_replace)
+        with pytest.raises(OSError, match="disk full"):
+            ClassContainingNumpyArray(np_a={"x": np.ones(1000)}).save(
+                target, array_threshold=800, strict=False
+            )
+        monkeypatch.undo()
+        assert load(target).np_a["x"].sum() == 0
+
+        for path in tmp_path.glob("*.npy"):
+            path.unlink()
+        with pytest.raises(MSONError, match="is missing"):
+            load(target)
+
+    def test_save_atomic(self, tmp_path, monkeypatch):
+        obj = GoodMSONClass(1, 2, 3, unserializable=GoodNOTMSONClass(4, 5, 6))
+        target = tmp_path / "obj.json.gz"
+        obj.save(target)
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "obj.json.gz",
+            "obj.json.pkl",
+        ]
+        with open(target, "rb") as f:
+            assert f.read(2) == b"\x1f\x8b"
+        assert load(target).kwargs["unserializable"].a == 4
+        # The json file only contains the serialized object
+        with gzip.open(target, "rt", encoding="utf-8") as f:
+            assert set(json.load(f)) == set(obj.as_dict())
+
+        # A save interrupted before the json file is renamed leaves the old
+        # json file with a pickle file that does not belong to it
+        replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith(".gz"):
+                raise OSError("disk full")
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", failing_replace)
+        with pytest.raises(OSError, match="disk full"):
+            GoodMSONClass(7, 8, 9, unserializable=GoodNOTMSONClass(1, 1, 1)).save(
+                target, strict=False
+            )
+        monkeypatch.undo()
+        assert len(list(tmp_path.iterdir())) == 2
+        with pytest.raises(MSONError, match="does not belong"):
+            load(target)
+
+        (tmp_path / "obj.json.pkl").unlink()
+        with pytest.raises(MSONError, match="is missing"):
+            GoodMSONClass.load(target)
+
+        # The dict returned by as_dict is not modified
+        state = {
+            "@module": "tests.test_json",
+            "@class": "StateMSONClass",
+            "@version": None,
+            "a": 1,
+        }
+        stateful = StateMSONClass(dict(state))
+        stateful.save(tmp_path / "state.json")
+        assert stateful.as_dict() == state
+
+        # Files written by get_partial_json
+        encoded, name_object_map, _, _ = obj.get_partial_json()
+        (tmp_path / "legacy.json").write_text(encoded, encoding="utf-8")
+        with open(tmp_path / "legacy.pkl", "wb") as f:
+            pickle.dump(name_object_map, f)
+        assert load(tmp_path / "legacy.json").kwargs["unserializable"].b == 5
+
 
 class TestJson:
     def test_as_from_dict(self):
@@ -509,6 +911,147 @@ class TestJson:
         assert t2.type() == t.type()
         assert np.array_equal(t2, t)
 
+        for t in (
+            torch.arange(12, dtype=torch.float64).reshape(3, 4),
+            torch.tensor([[1 + 1j, 2 - 1j]], dtype=torch.complex64),
+            torch.tensor([True, False]),
+            torch.tensor([0.5, -1.25], dtype=torch.bfloat16),
+            torch.tensor(3),
+            torch.ones(2, requires_grad=True),
+            # Views with the conjugate and the negative bit set
+            torch.tensor([1 + 2j, 3 - 1j]).conj(),
+            torch.tensor([1 + 2j, 3 - 1j]).conj().imag,
+        ):
+            for array_encoding in ("list", "bytes"):
+                d = MontyEncoder(array_encoding=array_encoding).default(t)
+                assert d["data"]["encoding"] == (
+                    "bytes" if array_encoding == "bytes" else "base64"
+                )
+                t2 = MontyDecoder().process_decoded(d)
+                assert t2.type() == t.type()
+                assert t2.shape == t.shape
+                assert torch.equal(t2, t.detach())
+
+        # Nested lists written by older versions
+        d = {
+            "@module": "torch",
+            "@class": "Tensor",
+            "dtype": "torch.ComplexFloatTensor",
+            "data": [[1.0, 2.0], [1.0, -1.0]],
+        }
+        t = MontyDecoder().process_decoded(d)
+        assert torch.equal(t, torch.tensor([1 + 1j, 2 - 1j]))
+
+    def test_register_codec(self):
+        encoders = dict(monty.json._ENCODERS)
+        decoders = dict(monty.json._DECODERS)
+
+        class Interval:
+            def __init__(self, lo, hi):
+                self.lo, self.hi = lo, hi
+
+        class OpenInterval(Interval):
+            pass
+
+        def encode(o, encoder):
+            return {
+                "@module": "intervals",
+                "@class": "Interval",
+                "bounds": [o.lo, o.hi],
+            }
+
+        def decode(d, decoder):
+            return Interval(*decoder.process_decoded(d["bounds"]))
+
+        register_codec(Interval, encode, decode, module="intervals")
+        try:
+            obj = {"a": Interval(1, np.array([2.0])), "b": OpenInterval(0, 1)}
+            s = json.dumps(obj, cls=MontyEncoder)
+            assert json.loads(s)["b"]["bounds"] == [0, 1]
+
+            decoded = json.loads(s, cls=MontyDecoder)
+            assert isinstance(decoded["a"], Interval)
+            assert decoded["a"].lo == 1
+            assert isinstance(decoded["a"].hi, np.ndarray)
+            assert type(decoded["b"]) is Interval
+
+            # The codec of the most specific class wins, whether registered
+            # by type or by name
+            name = f"{OpenInterval.__module__}.{OpenInterval.__qualname__}"
+            register_codec(name, lambda o, encoder: [o.lo, o.hi])
+            encoded = json.loads(json.dumps(obj, cls=MontyEncoder))
+            assert encoded["a"]["bounds"] == [1, encoded["a"]["bounds"][1]]
+            assert encoded["b"] == [0, 1]
+
+            # Registering a type again replaces its codec, and decoders can
+            # decline with NotImplemented
+            register_codec(
+                Interval,
+                encode,
+                lambda d, decoder: NotImplemented,
+                module="intervals",
+            )
+            assert json.loads(s, cls=MontyDecoder)["b"]["bounds"] == [0, 1]
+        finally:
+            monty.json._ENCODERS.clear()
+            monty.json._ENCODERS.update(encoders)
+            monty.json._DECODERS.clear()
+            monty.json._DECODERS.update(decoders)
+            monty.json._find_encoder.cache_clear()
+            clear_class_cache()
+
+        with pytest.raises(TypeError, match="Expected a type"):
+            register_codec(Interval(1, 2), encode)
+
+    def test_dumps(self):
+        objs = [
+            GoodMSONClass(1, [2.5, "b"], {"c": np.arange(3)}, kw="x"),
+            {1: "int key", 2.5: "float key", None: "none key"},
+            [datetime.datetime(2020, 1, 1), pathlib.Path("a")],
+            {"big": 2**70},
+            Point(1, 2),
+            {"b": 1, "a": [np.float64(1.5), np.int64(3)]},
+        ]
+        for obj in objs:
+            for kwargs in ({}, {"indent": 2, "sort_keys": True}, {"indent": 4}):
+                if isinstance(obj, dict) and None in obj and kwargs:
+                    # json.dumps can't sort keys of mixed types
+                    continue
+                expected = json.dumps(obj, cls=MontyEncoder, **kwargs)
+                s = dumps(obj, **kwargs)
+                assert json.loads(s) == json.loads(expected)
+                if kwargs.get("indent") == 2:
+                    assert s == expected
+
+        assert json.loads(dumps({"b": 1, "a": 2}, sort_keys=True)) == {"a": 2, "b": 1}
+        with pytest.raises(TypeError):
+            dumps({"a": GoodNOTMSONClass(1, 2, 3)})
+
+        obj = GoodMSONClass(1, 2, 3)
+        assert json.loads(obj.to_json()) == json.loads(
+            json.dumps(obj, cls=MontyEncoder)
+        )
+
+        # Types orjson serializes differently from json.dumps are written by
+        # json.dumps, so that they round trip
+        uuid = __import__("uuid").uuid4()
+        objs = [
+            {"nan": float("nan"), "inf": [float("-inf")]},
+            {"enum": EnumTest.a, "plain": [EnumNoAsDict.name_a]},
+            GoodMSONClass(1, 2, 3, kw=EnumTest.a),
+            {"uuid": uuid, 1.5: [uuid]},
+        ]
+        for obj in objs:
+            assert dumps(obj) == json.dumps(obj, cls=MontyEncoder)
+        decoded = json.loads(
+            dumps({"enum": EnumTest.a, "uuid": uuid}), cls=MontyDecoder
+        )
+        assert decoded == {"enum": EnumTest.a, "uuid": uuid}
+        assert math.isnan(json.loads(dumps([float("nan")]))[0])
+        # json.dumps options orjson does not support use json
+        obj = {"a": [1.5, "b"]}
+        assert dumps(obj, allow_nan=False) == json.dumps(obj, cls=MontyEncoder)
+
     def test_datetime(self):
         dt = datetime.datetime.now()
         jsonstr = json.dumps(dt, cls=MontyEncoder)
@@ -529,9 +1072,33 @@ class TestJson:
 
         created_at_after = MontyDecoder().process_decoded(data)
 
-        assert str(created_at_after).rstrip("0") == str(created_at).rstrip(
-            "+00:00"
-        ).rstrip("0")
+        assert created_at_after == created_at
+        assert created_at_after.tzinfo == datetime.timezone.utc
+
+        dt = datetime.datetime(
+            2020,
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=-5)),
+        )
+        data = json.loads(json.dumps(dt, cls=MontyEncoder))
+        assert data["string"] == "2020-01-02T03:04:05.000006-05:00"
+        assert MontyDecoder().process_decoded(data).utcoffset() == dt.utcoffset()
+
+        # Strings written by older versions with str(datetime)
+        for string, expected in (
+            ("2020-01-02 03:04:05.000006", dt.replace(tzinfo=None)),
+            ("2020-01-02 03:04:05", dt.replace(microsecond=0, tzinfo=None)),
+            ("2020-01-02 03:04:05.000006-05:00", dt),
+        ):
+            data = {"@module": "datetime", "@class": "datetime", "string": string}
+            decoded = MontyDecoder().process_decoded(data)
+            assert decoded == expected
+            assert decoded.tzinfo == expected.tzinfo
 
     def test_uuid(self):
         from uuid import UUID, uuid4
@@ -631,6 +1198,47 @@ class TestJson:
         assert isinstance(obj.np_a["a"][0]["b"], np.ndarray)
         assert obj.np_a["a"][0]["b"][0][1] == 2 + 1j
 
+    def test_numpy_array_encoding(self):
+        arrays = [
+            np.arange(12, dtype="float64").reshape(3, 4),
+            np.arange(12, dtype=">i4").reshape(4, 3)[:, ::2],
+            np.array([1 + 1j, 2 - 3j], dtype="complex64"),
+            np.array([True, False]),
+            np.array(3.5),
+            np.zeros((0, 3)),
+        ]
+        for x in arrays:
+            djson = json.dumps(x, cls=MontyEncoder, array_encoding="base64")
+            d = json.loads(djson)
+            assert d["encoding"] == "base64"
+            assert isinstance(d["data"], str)
+            assert d["shape"] == list(x.shape)
+            x2 = json.loads(djson, cls=MontyDecoder)
+            assert x2.dtype == x.dtype
+            assert x2.shape == x.shape
+            assert np.array_equal(x2, x)
+            assert x2.flags.writeable
+
+        # Object arrays fall back to lists
+        x = np.array([1, "a"], dtype=object)
+        d = MontyEncoder(array_encoding="base64").default(x)
+        assert d["data"] == [1, "a"]
+
+        # Raw bytes, as used by binary formats
+        x = np.arange(5, dtype="int16")
+        d = MontyEncoder(array_encoding="bytes").default(x)
+        assert isinstance(d["data"], bytes)
+        assert np.array_equal(MontyDecoder().process_decoded(d), x)
+
+        # Nested in MSONable
+        cls = ClassContainingNumpyArray(np_a={"a": [{"b": arrays[0]}]})
+        djson = json.dumps(cls, cls=MontyEncoder, array_encoding="base64")
+        obj = json.loads(djson, cls=MontyDecoder)
+        assert np.array_equal(obj.np_a["a"][0]["b"], arrays[0])
+
+        with pytest.raises(ValueError, match="array_encoding"):
+            MontyEncoder(array_encoding="hex")
+
     @pytest.mark.skipif(pd is None, reason="pandas not present")
     def test_pandas(self):
         cls = ClassContainingDataFrame(
@@ -673,6 +1281,96 @@ class TestJson:
         assert isinstance(obj.s["df"][0], pd.Series)
         assert list(obj.s["df"][0].a), [1, 2 == 3]
 
+    @pytest.mark.skipif(pd is None, reason="pandas not present")
+    def test_pandas_columnar(self):
+        df = pd.DataFrame(
+            {
+                "int": [1, 2, 3],
+                "float": [1.5, np.nan, 3.0],
+                "bool": [True, False, True],
+                "str": ["a", None, "c"],
+                "time": pd.to_datetime(["2020-01-01", "NaT", "2021-01-01"]),
+                "tz": pd.to_datetime(["2020-01-01", "NaT", "2021-01-01"]).tz_localize(
+                    "UTC"
+                ),
+                "category": pd.Categorical(["x", "y", "x"]),
+                "nullable": pd.array([1, None, 3], dtype="Int64"),
+                "lists": [[1, 2], [3, 4], [5, 6]],
+            },
+            index=pd.Index([10, 20, 30], name="idx"),
+        )
+        for array_encoding in ("list", "base64"):
+            s = json.dumps(df, cls=MontyEncoder, array_encoding=array_encoding)
+            d = json.loads(s)
+            # Stored as nested structures, not as an embedded JSON string
+            assert d["dtypes"][0] == "int64"
+            assert d["data"][0]["@class"] == "array"
+            assert d["data"][3] == ["a", None, "c"]
+            pd.testing.assert_frame_equal(json.loads(s, cls=MontyDecoder), df)
+
+        df = pd.DataFrame(
+            np.arange(6).reshape(3, 2),
+            columns=pd.MultiIndex.from_tuples([("a", 1), ("a", 2)], names=["x", "y"]),
+        )
+        d = json.loads(json.dumps(df, cls=MontyEncoder))
+        assert d["index"] == {"range": [0, 3, 1], "name": None}
+        pd.testing.assert_frame_equal(MontyDecoder().process_decoded(d), df)
+
+        df = pd.DataFrame([[1, 2]], columns=["a", "a"])
+        s = json.dumps(df, cls=MontyEncoder)
+        pd.testing.assert_frame_equal(json.loads(s, cls=MontyDecoder), df)
+
+        series = pd.Series([0.5, 1.5], index=["a", "b"], name=1)
+        s = json.dumps(series, cls=MontyEncoder)
+        pd.testing.assert_series_equal(json.loads(s, cls=MontyDecoder), series)
+
+        # Extension dtypes that are not plain lists of objects
+        df = pd.DataFrame(
+            {
+                "ordered": pd.Categorical(
+                    ["lo", "hi", None], categories=["lo", "hi"], ordered=True
+                ),
+                "period": pd.period_range("2020-01", periods=3, freq="M"),
+                "interval": pd.interval_range(0, 3, closed="left"),
+            },
+            index=pd.date_range("2020-01-01", periods=3, freq="D"),
+        )
+        for array_encoding in ("list", "base64"):
+            s = json.dumps(df, cls=MontyEncoder, array_encoding=array_encoding)
+            df2 = json.loads(s, cls=MontyDecoder)
+            pd.testing.assert_frame_equal(df2, df)
+            assert df2["ordered"].cat.ordered
+            assert list(df2["ordered"].cat.categories) == ["lo", "hi"]
+            assert df2.index.freq == "D"
+        for index in (
+            pd.period_range("2020-01", periods=3, freq="Q"),
+            pd.interval_range(0.0, 1.5, periods=3),
+            pd.CategoricalIndex(["b", "a", "b"], ordered=True),
+        ):
+            indexed = pd.Series([1, 2, 3], index=index)
+            s = json.dumps(indexed, cls=MontyEncoder)
+            pd.testing.assert_series_equal(json.loads(s, cls=MontyDecoder), indexed)
+
+        # Other extension dtypes fall back to DataFrame.to_json
+        df = pd.DataFrame({"a": pd.arrays.SparseArray([0, 0, 1])})
+        d = json.loads(json.dumps(df, cls=MontyEncoder))
+        assert isinstance(d["data"], str)
+        assert list(MontyDecoder().process_decoded(d)["a"]) == [0, 0, 1]
+
+        # Format written by older versions
+        legacy = {
+            "@module": "pandas",
+            "@class": "DataFrame",
+            "data": pd.DataFrame([[1, 2]], columns=["a", "b"]).to_json(),
+        }
+        assert MontyDecoder().process_decoded(legacy).shape == (1, 2)
+        legacy = {
+            "@module": "pandas",
+            "@class": "Series",
+            "data": series.to_json(),
+        }
+        assert list(MontyDecoder().process_decoded(legacy)) == [0.5, 1.5]
+
     @pytest.mark.skipif(pint is None, reason="pint not present")
     def test_pint_quantity(self):
         ureg = pint.UnitRegistry()
@@ -875,6 +1573,30 @@ class TestJson:
         clean = jsanitize(d, strict=True)
         assert "@class" in clean["c"]
 
+    def test_jsanitize_fast_paths(self):
+        for arr in (
+            np.arange(6, dtype="int32").reshape(2, 3),
+            np.linspace(0, 1, 5, dtype="float32"),
+            np.array([True, False]),
+            np.array(["a", "bc"]),
+            np.array(2.5),
+        ):
+            for strict in (False, True):
+                clean = jsanitize(arr, strict=strict)
+                assert clean == arr.tolist()
+                assert json.loads(json.dumps(clean)) == clean
+
+        # Non-primitive dtypes still go through the element-wise path
+        clean = jsanitize(np.array([1 + 2j]))
+        assert clean == ["(1+2j)"]
+        clean = jsanitize(np.array([EnumNoAsDict.name_a], dtype=object))
+        assert clean[0]["value"] == "value_a"
+
+        mixed = (1, 2.5, "a", None, True)
+        assert jsanitize(mixed) == list(mixed)
+        assert jsanitize([1, np.float64(2.5)]) == [1, 2.5]
+        assert type(jsanitize([1, np.float64(2.5)])[1]) is float
+
     def test_unserializable_composite(self):
         class Unserializable:
             def __init__(self, a):
@@ -968,6 +1690,109 @@ class TestJson:
             # AnotherClass from tests.test_json instead of tests.test_json2
             json.loads(json.dumps(d2), cls=MontyDecoder)
 
+    def test_class_cache(self):
+        clear_class_cache()
+        obj = GoodMSONClass(1, 2, 3)
+        s = json.dumps([obj, obj, obj], cls=MontyEncoder)
+        objs = json.loads(s, cls=MontyDecoder)
+        assert all(isinstance(o, GoodMSONClass) for o in objs)
+        info = _resolve_class.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+        assert _resolve_class("tests.test_json", "GoodMSONClass") == (
+            "tests.test_json",
+            "GoodMSONClass",
+            GoodMSONClass,
+            "from_dict",
+        )
+        assert _resolve_class("tests.test_json", "EnumNoAsDict")[3] == "enum"
+        assert _resolve_class("tests.test_json", "Point")[3] == "dataclass"
+        assert _resolve_class("tests.test_json", "MissingClass")[2:] == (None, None)
+
+        # Changes to the redirect table invalidate the cache
+        d = {"@module": "tests.test_json", "@class": "MovedClass", "a": 1}
+        assert MontyDecoder().process_decoded(d) == d
+        MSONable.REDIRECT["tests.test_json"] = {
+            "MovedClass": {"@class": "LimitedMSONClass", "@module": "tests.test_json"}
+        }
+        try:
+            assert isinstance(MontyDecoder().process_decoded(d), LimitedMSONClass)
+        finally:
+            del MSONable.REDIRECT["tests.test_json"]
+        assert MontyDecoder().process_decoded(d) == d
+
+    def test_redirect_registry(self, tmp_path):
+        file1, file2 = tmp_path / "redirect1.yaml", tmp_path / "redirect2.yaml"
+        file1.write_text(
+            "old.A: tests.test_json.GoodMSONClass\nold.B: tests.test_json.Point\n"
+        )
+        registry = RedirectRegistry([file1, file2], reload_interval=None)
+        assert registry.files == [str(file1), str(file2)]
+        assert registry.flat == {
+            ("old", "A"): ("tests.test_json", "GoodMSONClass"),
+            ("old", "B"): ("tests.test_json", "Point"),
+        }
+
+        # Later files take precedence and are read once they exist
+        file2.write_text("old.B: tests.test_json.LimitedMSONClass\n")
+        assert registry.get("old", "B") == ("tests.test_json", "Point")
+        assert registry.reload()
+        assert not registry.reload()
+        assert registry.get("old", "B") == ("tests.test_json", "LimitedMSONClass")
+
+        # Programmatic changes take precedence over the files
+        registry.register("old.C", "new.C")
+        registry.unregister("old.A")
+        assert registry.view == {
+            "old": {
+                "B": {"@module": "tests.test_json", "@class": "LimitedMSONClass"},
+                "C": {"@module": "new", "@class": "C"},
+            }
+        }
+        registry.view["old"]["D"] = {"@module": "new", "@class": "D"}
+        del registry.view["old"]["C"]
+        assert registry.flat == {
+            ("old", "B"): ("tests.test_json", "LimitedMSONClass"),
+            ("old", "D"): ("new", "D"),
+        }
+        registry.remove_file(file2)
+        assert registry.get("old", "B") == ("tests.test_json", "Point")
+        registry.add_file(file2)
+        assert registry.get("old", "B") == ("tests.test_json", "LimitedMSONClass")
+
+        # The default registry reloads modified files between decodes
+        file3 = tmp_path / "redirect3.yaml"
+        file3.write_text("tests.test_json.OldClass: tests.test_json.GoodMSONClass\n")
+        d = {"@module": "tests.test_json", "@class": "OldClass", "a": 1, "b": 2, "c": 3}
+        REDIRECTS.add_file(file3)
+        try:
+            assert isinstance(MontyDecoder().process_decoded(d), GoodMSONClass)
+            file3.write_text("tests.test_json.OldClass: tests.test_json.Missing\n")
+            os.utime(file3, ns=(0, 0))
+            REDIRECTS._next_check = 0
+            assert MontyDecoder().process_decoded(d) == d
+        finally:
+            REDIRECTS.remove_file(file3)
+        assert MontyDecoder().process_decoded(d) == d
+
+        # Assigning MSONable.REDIRECT replaces the redirects
+        old_redirect = {k: dict(v) for k, v in MSONable.REDIRECT.items()}
+        new_redirect = {
+            "tests.test_json": {
+                "OldClass": {"@module": "tests.test_json", "@class": "GoodMSONClass"}
+            }
+        }
+        MSONable.REDIRECT = new_redirect
+        try:
+            assert isinstance(MontyDecoder().process_decoded(d), GoodMSONClass)
+            assert MSONable.REDIRECT == new_redirect
+            assert MSONable.REDIRECT is REDIRECTS.view
+        finally:
+            MSONable.REDIRECT = old_redirect
+            MontyDecoder().process_decoded({})
+        assert MSONable.REDIRECT == old_redirect
+        assert MontyDecoder().process_decoded(d) == d
+
     def test_redirect_settings_file(self):
         data = _load_redirect(os.path.join(TEST_DIR, "test_settings.yaml"))
         assert data == {
@@ -976,6 +1801,37 @@ class TestJson:
             }
         }
 
+    def test_lazy_imports(self, tmp_path):
+        """Importing monty.json and monty.serialization is fast and does not
+        import numpy, ruamel.yaml, bson, zstandard or read ~/.monty.yaml."""
+        shutil.copy(
+            os.path.join(TEST_DIR, "test_settings.yaml"), tmp_path / ".monty.yaml"
+        )
+        code = """
+import sys, time
+start = time.perf_counter()
+import monty.json, monty.msgpack, monty.serialization
+elapsed = time.perf_counter() - start
+heavy = ["numpy", "ruamel.yaml", "bson", "pandas", "multiprocessing", "zstandard"]
+print(elapsed, [m for m in heavy if m in sys.modules])
+print(monty.json.REDIRECTS._loaded)
+print(monty.json.MSONable.REDIRECT["old_module"]["old_class"]["@class"])
+"""
+        env = {**os.environ, "HOME": str(tmp_path), "USERPROFILE": str(tmp_path)}
+        # The first run may have to compile bytecode
+        for _ in range(2):
+            out = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                text=True,
+                env=env,
+                check=True,
+            ).stdout.splitlines()
+        elapsed, modules = out[0].split(" ", 1)
+        assert modules == "[]"
+        assert out[1:] == ["False", "new_class"]
+        assert float(elapsed) < 0.5
+
     @pytest.mark.skipif(pydantic is None, reason="pydantic not present")
     def test_pydantic_integrations(self):
         from pydantic import BaseModel, ValidationError
@@ -1114,6 +1970,77 @@ class TestJson:
         ndc2 = json.loads(str_, cls=MontyDecoder)
         assert isinstance(ndc2, NestedDataClass)
 
+    def test_decode_plan(self, monkeypatch):
+        assert _is_primitive_annotation(Optional[dict[str, list[float]]])
+        assert _is_primitive_annotation(tuple[int, ...])
+        assert _is_primitive_annotation(Literal["a", 1])
+        assert not _is_primitive_annotation(list)
+        assert not _is_primitive_annotation(Union[int, Point])
+        assert _get_decode_plan(Point).primitive == {"x", "y"}
+        assert _get_decode_plan(NestedDataClass).primitive == set()
+
+        # Values of primitive fields are not decoded
+        d = {"@module": "tests.test_json", "@class": "Point", "x": 1, "y": {}}
+        process_decoded = MontyDecoder.process_decoded
+        calls = []
+
+        def spy(self, obj):
+            calls.append(obj)
+            return process_decoded(self, obj)
+
+        monkeypatch.setattr(MontyDecoder, "process_decoded", spy)
+        assert MontyDecoder().process_decoded(d) == Point(1, {})
+        assert all(c is d for c in calls)
+
+    @pytest.mark.skipif(pydantic is None, reason="pydantic not present")
+    def test_pydantic_bulk_decode(self, monkeypatch):
+        global RecordModel, RecordModelInit  # allow models to be deserialized
+
+        class RecordModel(pydantic.BaseModel):
+            name: str
+            values: list[float]
+            obj: GoodMSONClass
+
+        class RecordModelInit(RecordModel):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+
+        records = [
+            RecordModel(name=str(i), values=[i], obj=GoodMSONClass(i, 2, 3))
+            for i in range(5)
+        ]
+        plan = _get_decode_plan(RecordModel)
+        assert plan.primitive == {"name", "values"}
+        assert plan.validate is not None
+        assert _get_decode_plan(RecordModelInit).validate is None
+
+        build_many = _DecodePlan.build_many
+        calls = []
+
+        def spy(self, items, decoder):
+            calls.append(len(items))
+            return build_many(self, items, decoder)
+
+        monkeypatch.setattr(_DecodePlan, "build_many", spy)
+        decoded = json.loads(json.dumps(records, cls=MontyEncoder), cls=MontyDecoder)
+        assert calls == [5]
+        assert [r.name for r in decoded] == ["0", "1", "2", "3", "4"]
+        assert isinstance(decoded[3].obj, GoodMSONClass)
+        assert decoded[3].obj.a == 3
+
+        # Validation errors report the index in the list
+        d = json.loads(json.dumps(records, cls=MontyEncoder))
+        d[3]["values"] = "x"
+        with pytest.raises(pydantic.ValidationError) as exc_info:
+            MontyDecoder().process_decoded(d)
+        assert exc_info.value.errors()[0]["loc"] == (3, "values")
+
+        # Mixed lists are decoded one by one
+        records[2] = RecordModelInit(name="x", values=[], obj=GoodMSONClass(1, 2, 3))
+        decoded = json.loads(json.dumps(records, cls=MontyEncoder), cls=MontyDecoder)
+        assert calls == [5, 5]
+        assert [type(r) for r in decoded] == [type(r) for r in records]
+
     def test_enum(self):
         s = MontyEncoder().encode(EnumNoAsDict.name_a)
         p = MontyDecoder().decode(s)
@@ -1246,6 +2173,41 @@ class TestCheckType:
         assert _check_type(model_instance, "pydantic.main.BaseModel")
         assert isinstance(model_instance, pydantic.BaseModel)
 
+    def test_type_kind(self):
+        class A:
+            pass
+
+        _type_kind.cache_clear()
+        assert _type_kind(A) is None
+        assert _type_kind(np.ndarray) is None
+        assert len(_type_kind._cache) == 2
+        assert _type_kind(A) is None
+        assert len(_type_kind._cache) == 2
+
+        # Classes created at runtime are not kept alive by the cache
+        B = type("B", (), {})
+        assert _check_type(B(), "tests.test_json.B")
+        assert _type_kind(B) is None
+        ref = weakref.ref(B)
+        del B
+        gc.collect()
+        assert ref() is None
+        assert len(_type_kind._cache) == 2
+
+        # A tuple matches if any of its type strings does
+        assert _check_type(A(), ("builtins.int", "builtins.object"))
+        assert not _check_type(A(), ("builtins.int", "builtins.str"))
+
+        if pd is not None:
+            assert _type_kind(pd.DataFrame) == "pandas"
+            assert _type_kind(pd.Index) == "pandas"
+        if pydantic is not None:
+
+            class MyModel(pydantic.BaseModel):
+                name: str
+
+            assert _type_kind(MyModel) == "pydantic"
+
     @pytest.mark.skipif(pint is None, reason="pint is not installed")
     def test_pint(self):
         ureg = pint.UnitRegistry()
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import datetime
 import glob
 import json
 import os
 import unittest
 
+import numpy as np
 import pytest
 
-from monty.serialization import dumpfn, loadfn
+from monty.io import zopen
+from monty.json import MSONable
+from monty.serialization import (
+    _JSONStream,
+    dump_jsonl,
+    dumpfn,
+    dumpfn_many,
+    iter_jsonl,
+    iter_loadfn,
+    loadfn,
+    loadfn_many,
+)
 from monty.tempfile import ScratchDir
 
 try:
@@ -16,6 +29,11 @@ except ImportError:
     msgpack = None
 
 
+class Shared(MSONable):
+    def __init__(self, value):
+        self.value = value
+
+
 class TestSerial:
     @classmethod
     def teardown_class(cls):
@@ -85,3 +103,253 @@ class TestSerial:
             with open("test_file.json", encoding="utf-8") as f:
                 reloaded = json.loads(f.read())
             assert reloaded["test"] == 1
+
+    def test_iter_loadfn(self, tmp_path):
+        docs = [
+            {"i": i, "arr": np.arange(i), "t": datetime.datetime(2020, 1, i + 1)}
+            for i in range(20)
+        ]
+        for ext in ("json", "json.gz", "json.bz2"):
+            fn = tmp_path / f"docs.{ext}"
+            dumpfn(docs, fn, indent=2)
+            # Use a tiny chunk size to exercise values spanning chunks
+            loaded = list(iter_loadfn(fn, chunk_size=7))
+            assert len(loaded) == len(docs)
+            for doc, doc2 in zip(docs, loaded):
+                assert doc2["i"] == doc["i"]
+                assert isinstance(doc2["arr"], np.ndarray)
+                assert np.array_equal(doc2["arr"], doc["arr"])
+                assert doc2["t"] == doc["t"]
+
+        fn = tmp_path / "nested.json"
+        dumpfn({"meta": {"docs": [0]}, "docs": [123456789, 2.5, "a", None]}, fn)
+        assert list(iter_loadfn(fn, "docs.item", chunk_size=3)) == [
+            123456789,
+            2.5,
+            "a",
+            None,
+        ]
+        assert list(iter_loadfn(fn, "meta.docs.item")) == [0]
+        with pytest.raises(KeyError):
+            list(iter_loadfn(fn, "missing.item"))
+        with pytest.raises(ValueError):
+            list(iter_loadfn(fn, "docs"))
+
+        dumpfn([], fn)
+        assert list(iter_loadfn(fn)) == []
+
+        # Elements are yielded before the rest of the file is parsed
+        with open(fn, "w", encoding="utf-8") as f:
+            f.write('[{"a": 1}, {"a": 2}, {"a"')
+        it = iter_loadfn(fn)
+        assert next(it) == {"a": 1}
+        assert next(it) == {"a": 2}
+        with pytest.raises(json.JSONDecodeError):
+            next(it)
+
+        # Numbers split by a chunk boundary after "." or "e" are not cut short
+        numbers = [0.125, 1e-07, -2.5e300, 12345678901234567890, 3, -0.0, 1.5]
+        with open(fn, "w", encoding="utf-8") as f:
+            f.write(json.dumps(numbers).replace("-07", "-7").replace("e+", "E"))
+        for chunk_size in range(1, 17):
+            assert list(iter_loadfn(fn, chunk_size=chunk_size)) == numbers
+        with open(fn, "w", encoding="utf-8") as f:
+            json.dump({"x": [0.5, 2e10]}, f, indent=1)
+        assert list(iter_loadfn(fn, "x.item", chunk_size=2)) == [0.5, 2e10]
+
+    def test_iter_loadfn_skip(self, tmp_path, monkeypatch):
+        """Values stored before the requested key are skipped without being
+        loaded into memory."""
+        fn = tmp_path / "skip.json"
+        doc = {
+            "big": list(range(10000)),
+            "tricky": ['"]}', "\\", '\\"[{', {"a": [[], {}]}, "é☃"],
+            "n": -1.5e3,
+            "flag": True,
+            "docs": [1, {"b": "]"}],
+        }
+        dumpfn(doc, fn)
+        for chunk_size in range(1, 9):
+            assert list(iter_loadfn(fn, "docs.item", chunk_size=chunk_size)) == [
+                1,
+                {"b": "]"},
+            ]
+
+        buffer_sizes = []
+        fill = _JSONStream._fill
+
+        def tracking_fill(self, size):
+            buffer_sizes.append(len(self._buffer) - self._pos)
+            return fill(self, size)
+
+        monkeypatch.setattr(_JSONStream, "_fill", tracking_fill)
+        assert list(iter_loadfn(fn, "docs.item", chunk_size=64))[0] == 1
+        assert max(buffer_sizes) < 64
+
+        with open(fn, "w", encoding="utf-8") as f:
+            f.write('{"a": ["unterminated]}')
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_loadfn(fn, "docs.item"))
+
+    def test_jsonl(self, tmp_path):
+        records = [
+            {"i": i, "arr": np.arange(3) * i, "t": datetime.datetime(2020, 1, 1)}
+            for i in range(10)
+        ]
+        for ext in ("jsonl", "jsonl.gz", "jsonl.bz2"):
+            fn = tmp_path / f"records.{ext}"
+            dumpfn(records[:6], fn)
+            dump_jsonl(records[6:], fn, append=True)
+
+            with pytest.raises(ValueError, match="indent"):
+                dumpfn(records, fn, indent=2)
+
+            loaded = loadfn(fn)
+            assert [r["i"] for r in loaded] == list(range(10))
+            assert all(isinstance(r["arr"], np.ndarray) for r in loaded)
+            assert isinstance(loaded[0]["t"], datetime.datetime)
+
+            # Lazy reading only decodes what is consumed
+            it = iter_jsonl(fn)
+            assert next(it)["i"] == 0
+            it.close()
+
+            parallel = list(iter_jsonl(fn, nprocs=2, chunksize=3))
+            assert [r["i"] for r in parallel] == list(range(10))
+            assert np.array_equal(parallel[-1]["arr"], records[-1]["arr"])
+
+        # Overwrite by default
+        dumpfn(records[:2], fn, fmt="jsonl")
+        assert len(loadfn(fn, fmt="jsonl")) == 2
+
+        # JSON-LD files are single JSON documents
+        fn = tmp_path / "schema.jsonld"
+        dumpfn({"@context": {"name": "http://schema.org/name"}}, fn, indent=2)
+        assert loadfn(fn) == {"@context": {"name": "http://schema.org/name"}}
+
+    def test_jsonl_track_refs(self, tmp_path):
+        shared = Shared([1, 2, 3])
+        fn = tmp_path / "refs.jsonl"
+        # Every record only refers to objects serialized in the same line
+        dump_jsonl([[shared, shared], {"again": shared}], fn, track_refs=True)
+        first, second = iter_jsonl(fn)
+        assert first[0] is first[1]
+        assert first[0].value == [1, 2, 3]
+        assert second["again"].value == [1, 2, 3]
+
+    def test_loadfn_sniff_fmt(self, tmp_path):
+        obj = {"a": [1, 2.5, "x"], "t": datetime.datetime(2020, 1, 1)}
+        fmts = ["json", "yaml"] + (["mpk"] if msgpack is not None else [])
+        for fmt in fmts:
+            for compressed in ("", ".gz"):
+                # Written under a misleading or missing extension
+                fn = tmp_path / f"{fmt}{compressed}"
+                dumpfn(obj if fmt != "yaml" else {"a": [1, 2.5, "x"]}, fn, fmt=fmt)
+                renamed = tmp_path / f"blob_{fmt}{compressed.replace('.', '_')}"
+                os.rename(fn, renamed)
+
+                loaded = loadfn(renamed)
+                assert loaded["a"] == [1, 2.5, "x"]
+                if fmt != "yaml":
+                    assert loaded["t"] == obj["t"]
+
+        # A UTF-8 byte order mark and leading whitespace are skipped
+        fn = tmp_path / "bom"
+        fn.write_bytes(b"\xef\xbb\xbf\n  [1, 2]")
+        assert loadfn(fn) == [1, 2]
+
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_dumpfn_loadfn_many(self, tmp_path, executor):
+        objs = [{"i": i, "arr": np.arange(i)} for i in range(12)]
+        fns = [tmp_path / f"obj{i}.json.gz" for i in range(12)]
+        # An error in the middle of the batch does not stop it
+        fns[5] = tmp_path / "missing" / "obj5.json"
+
+        errors = dumpfn_many(zip(objs, fns), executor=executor, max_workers=2, indent=2)
+        assert [e is None for e in errors] == [i != 5 for i in range(12)]
+        assert isinstance(errors[5], FileNotFoundError)
+
+        loaded = list(loadfn_many(fns, executor=executor, max_workers=2))
+        assert isinstance(loaded[5], FileNotFoundError)
+        for i, obj in enumerate(loaded):
+            if i != 5:
+                assert obj["i"] == i
+                assert np.array_equal(obj["arr"], np.arange(i))
+
+        with pytest.raises(ValueError, match="executor"):
+            dumpfn_many([], executor="cluster")
+
+    @unittest.skipIf(msgpack is None, "msgpack-python not installed.")
+    def test_mpk_ext_types(self, tmp_path):
+        import pathlib
+        import uuid
+
+        from monty.msgpack import default, ext_hook
+
+        arrays = [
+            np.arange(12, dtype="float64").reshape(3, 4),
+            np.arange(12, dtype=">i4").reshape(4, 3)[:, ::2],
+            np.array([1 + 1j, 2 - 3j], dtype="complex64"),
+            np.array(3.5),
+            np.array(["2020-01-01"], dtype="datetime64[ns]"),
+        ]
+        d = {
+            "arrays": arrays,
+            "naive": datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+            "aware": datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc),
+            "uuid": uuid.uuid4(),
+            "path": pathlib.Path("/home/user"),
+        }
+        # Arrays are stored as raw buffers, not lists of numbers
+        arr = np.linspace(0, 1, 1000)
+        assert len(msgpack.packb(arr, default=default)) < arr.nbytes + 200
+        # In the layout of MontyEncoder(array_encoding="bytes")
+        code, data = msgpack.unpackb(msgpack.packb(arr, default=default))
+        assert msgpack.unpackb(data)["encoding"] == "bytes"
+        for ext in ("mpk", "mpk.gz"):
+            fn = tmp_path / f"data.{ext}"
+            dumpfn(d, fn)
+            d2 = loadfn(fn)
+            for arr, arr2 in zip(d["arrays"], d2["arrays"]):
+                assert isinstance(arr2, np.ndarray)
+                assert arr2.dtype == arr.dtype
+                assert np.array_equal(arr2, arr)
+                assert arr2.flags.writeable
+            for key in ("naive", "aware", "uuid", "path"):
+                assert d2[key] == d[key]
+            assert d2["aware"].tzinfo is not None
+
+        # Unknown extension types are left untouched
+        ext = msgpack.ExtType(42, b"data")
+        assert msgpack.unpackb(msgpack.packb(ext), ext_hook=ext_hook) == ext
+
+        # Object arrays go through MontyEncoder
+        obj_arr = np.array([1, "a"], dtype=object)
+        d2 = msgpack.unpackb(msgpack.packb(obj_arr, default=default))
+        assert d2["@class"] == "array"
+
+    @unittest.skipIf(msgpack is None, "msgpack-python not installed.")
+    def test_mpk_packer_unpacker(self, tmp_path):
+        from monty.msgpack import Packer, Unpacker
+
+        records = [
+            {"i": i, "arr": np.arange(i), "t": datetime.datetime(2020, 1, 1)}
+            for i in range(5)
+        ]
+        fn = tmp_path / "records.mpk.gz"
+        packer = Packer()
+        with zopen(fn, "wb") as f:
+            for record in records:
+                f.write(packer.pack(record))
+
+        with zopen(fn, "rb") as f:
+            loaded = list(Unpacker(f))
+        assert [r["i"] for r in loaded] == list(range(5))
+        assert np.array_equal(loaded[-1]["arr"], np.arange(4))
+        assert loaded[0]["t"] == records[0]["t"]
+
+        unpacker = Unpacker()
+        unpacker.feed(
+            packer.pack({"@module": "pathlib", "@class": "Path", "string": "a"})
+        )
+        assert str(unpacker.unpack()) == "a"